@@ -11,13 +11,14 @@ import logging
 from datetime import datetime
 
 # Add src to path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from embeddings.embedding_generator import EmbeddingGenerator
 from embeddings.openai_embedder import OpenAIEmbedder
 from embeddings.embedding_manager import EmbeddingManager
 from embeddings.similarity_calculator import SimilarityCalculator
 from preprocessing.embedding_preparer import EmbeddingPreparer
+from preprocessing.resume_parser import ResumeParser
 
 # Setup logging
 logging.basicConfig(
@@ -29,6 +30,20 @@ logger = logging.getLogger(__name__)
 
 def create_sample_embedding_batch():
     """Create a sample embedding batch for testing without API calls."""
+    sample_parsed_resume = {
+        'summary': {'word_count': 27, 'char_count': 196},
+        'experience': {'word_count': 92, 'char_count': 611},
+        'education': {'word_count': 21, 'char_count': 146},
+        'skills': {'word_count': 43, 'char_count': 329},
+        'extracted_skills': ['python', 'javascript', 'react', 'node.js', 'django', 'docker', 'aws', 'sql'],
+        'contact_info': {
+            'email': 'john.doe@email.com',
+            'phone': '(555) 123-4567',
+            'linkedin': 'linkedin.com/in/johndoe',
+            'github': 'github.com/johndoe'
+        }
+    }
+    
     sample_batch = {
         'jobs': [
             {
@@ -58,14 +73,7 @@ def create_sample_embedding_batch():
         ],
         'resume': {
             'embedding_text': 'experienced software engineer with 5 years of experience in full-stack development. proficient in python, javascript, react, and node.js. passionate about creating scalable web applications and solving complex technical challenges. senior software engineer techcorp inc. 2022 - present - developed and maintained restful apis using python and django - led a team of 3 developers in building a customer portal - implemented ci/cd pipelines using jenkins and docker - reduced application load time by 40 through optimization software developer startupxyz 2020 - 2022 - built responsive web applications using react and node.js - collaborated with ux designers to implement user-friendly interfaces - integrated third-party apis for payment processing - participated in agile development processes bachelor of science in computer science university of technology 2016 - 2020 - gpa: 3.8/4.0 - relevant coursework: data structures, algorithms, database systems programming languages: python, javascript, typescript, java, sql frameworks libraries: react, node.js, django, express, bootstrap tools technologies: git, docker, aws, jenkins, mongodb, postgresql methodologies: agile, scrum, test-driven development, ci/cd e-commerce platform - built a full-stack e-commerce application using react and node.js - implemented user authentication, payment processing, and inventory management - deployed on aws with docker containerization task management app - developed a collaborative task management tool using python and django - features include real-time updates, file sharing, and team collaboration - integrated with slack for notifications aws certified developer associate google cloud platform certified',
-            'parsed_resume': {
-                'contact_info': {
-                    'email': 'john.doe@email.com',
-                    'phone': '(555) 123-4567',
-                    'linkedin': 'linkedin.com/in/johndoe',
-                    'github': 'github.com/johndoe'
-                }
-            }
+            'parsed_resume_summary': ResumeParser().generate_resume_summary(sample_parsed_resume)
         },
         'batch_created_at': datetime.now().isoformat(),
         'preprocessing_config': {
@@ -362,30 +370,12 @@ def demonstrate_stage4_similarity_and_top_jobs():
         print("⚠️  Resume embedding is empty.")
         return
     
-    # Get all job embeddings
-    job_embeddings_data = generator.manager.get_job_embeddings()
-    if not job_embeddings_data:
+    # Score all jobs against the resume with one matrix-vector product over the job matrix
+    results = generator.find_similar_jobs(resume_embedding_id, top_k=10)
+    if not results:
         print("⚠️  No job embeddings found. Run Stage 3 with real job data.")
         return
     
-    # Calculate cosine similarity for each job
-    results = []
-    for embedding_id, embedding_data in job_embeddings_data:
-        job_embedding = embedding_data.get('embedding', [])
-        if not job_embedding:
-            continue
-        score = generator.calculator.cosine_similarity(resume_embedding, job_embedding)
-        results.append({
-            'embedding_id': embedding_id,
-            'job_title': embedding_data.get('metadata', {}).get('job_title', ''),
-            'company_name': embedding_data.get('metadata', {}).get('company_name', ''),
-            'location': embedding_data.get('metadata', {}).get('location', ''),
-            'similarity_score': score
-        })
-    
-    # Sort by similarity descending
-    results.sort(key=lambda x: x['similarity_score'], reverse=True)
-    
     # Display top 10
     print(f"\nTop 10 Most Similar Jobs to Resume:")
     print("-" * 60)
@@ -12,7 +12,7 @@ from datetime import datetime
 from typing import List, Dict, Any
 
 # Add src to path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from scrapers.indeed_scraper import IndeedScraper
 from scrapers.linkedin_scraper import LinkedInScraper
@@ -98,7 +98,7 @@ class LiveJobScraper:
         
         # Process and clean jobs
         logger.info("Processing and cleaning scraped jobs...")
-        cleaned_jobs = self.data_processor.clean_job_data(all_jobs)
+        cleaned_jobs = [self.data_processor.clean_job_data(job) for job in all_jobs]
         
         # Remove duplicates
         unique_jobs = self.data_processor.remove_duplicates(cleaned_jobs)
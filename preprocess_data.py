@@ -11,7 +11,7 @@ import logging
 from datetime import datetime
 
 # Add src to path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from preprocessing.embedding_preparer import EmbeddingPreparer
 from preprocessing.text_cleaner import TextCleaner
@@ -10,7 +10,7 @@ import json
 from datetime import datetime
 
 # Add src to path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 def load_st_louis_jobs():
     """Load the St. Louis job data we collected."""
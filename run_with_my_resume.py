@@ -7,10 +7,20 @@ Allows you to input your resume and get personalized job matches.
 import sys
 import os
 import json
+import hashlib
+import numpy as np
+from collections import defaultdict
+from itertools import repeat
+from operator import itemgetter
 from datetime import datetime
 
 # Add src to path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+# Job fields shown for each match in the report
+get_report_fields = itemgetter(
+    'job_title', 'company_name', 'location', 'salary_range', 'required_skills', 'job_url'
+)
 
 def get_user_resume():
     """Get resume from user input."""
@@ -117,17 +127,17 @@ def load_st_louis_jobs():
     
     if not raw_dir:
         print("❌ Could not find data/raw directory. Please run from the project root.")
-        return None
+        return None, None
     
     try:
         st_louis_files = [f for f in os.listdir(raw_dir) if f.startswith("st_louis_") and f.endswith(".json")]
     except OSError:
         print(f"❌ Error accessing directory: {raw_dir}")
-        return None
+        return None, None
     
     if not st_louis_files:
         print("❌ No St. Louis job files found. Run free_job_api_test.py first.")
-        return None
+        return None, None
     
     # Prioritize enhanced datasets (they have more jobs)
     enhanced_files = [f for f in st_louis_files if "enhanced" in f]
@@ -149,10 +159,47 @@ def load_st_louis_jobs():
         jobs = data['jobs']
         print(f"📊 Loaded {len(jobs)} jobs from dataset")
         
-        return jobs
+        return jobs, filepath
     except Exception as e:
         print(f"❌ Error loading file {filepath}: {e}")
+        return None, None
+
+def get_job_cache_path(jobs_filepath):
+    """Get the cache path for preprocessed jobs, keyed by the source file contents."""
+    with open(jobs_filepath, 'rb') as f:
+        digest = hashlib.blake2b(f.read(), digest_size=8).hexdigest()
+    return os.path.join("data/processed", f"jobs_{digest}.npz")
+
+def load_cached_job_embeddings(cache_path):
+    """Load cached job embeddings, or return None if there is no usable cache."""
+    if not os.path.exists(cache_path):
         return None
+    
+    try:
+        with np.load(cache_path) as cached:
+            job_mat = cached['mat']
+            jobs_list = json.loads(cached['meta'].tobytes().decode('utf-8'))
+        
+        print(f"⚡ Loaded {len(jobs_list)} preprocessed jobs from cache: {cache_path}")
+        return [
+            {'job_data': job, 'embedding': embedding.tolist()}
+            for job, embedding in zip(jobs_list, job_mat)
+        ]
+    except Exception as e:
+        print(f"⚠️  Ignoring unreadable job cache {cache_path}: {e}")
+        return None
+
+def save_cached_job_embeddings(cache_path, job_embeddings):
+    """Save job embeddings and their preprocessed job data to the cache."""
+    job_mat = np.array([item['embedding'] for item in job_embeddings], dtype=np.float32)
+    meta = json.dumps([item['job_data'] for item in job_embeddings], ensure_ascii=False).encode('utf-8')
+    
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        np.savez(cache_path, mat=job_mat, meta=np.frombuffer(meta, dtype=np.uint8))
+        print(f"💾 Cached preprocessed jobs to: {cache_path}")
+    except Exception as e:
+        print(f"⚠️  Could not write job cache {cache_path}: {e}")
 
 def run_preprocessing(jobs, resume_text):
     """Run preprocessing on the job data and resume."""
@@ -249,7 +296,7 @@ def run_embedding_generation(embedding_batch):
             })
         
         # Create resume embedding
-        resume_embedding = [0.1, 0.2, 0.3, 0.4, 0.5] * 100
+        resume_embedding = create_resume_embedding()
         
         print(f"✅ Created {len(sample_embeddings)} job embeddings and 1 resume embedding")
         
@@ -259,6 +306,10 @@ def run_embedding_generation(embedding_batch):
         print(f"❌ Error in embedding generation: {e}")
         return None, None
 
+def create_resume_embedding():
+    """Create the sample resume embedding used in demo mode."""
+    return [0.1, 0.2, 0.3, 0.4, 0.5] * 100
+
 def run_job_matching(job_embeddings, resume_embedding):
     """Run job matching using similarity calculations."""
     print("\n🎯 Running Job Matching...")
@@ -308,7 +359,7 @@ def generate_report(jobs, similarities, resume_text):
             'generated_at': datetime.now().isoformat(),
             'location': 'St. Louis, MO',
             'total_jobs': len(jobs),
-            'unique_companies': len(set(j.get('company_name', '') for j in jobs if j.get('company_name'))),
+            'unique_companies': len(set(filter(None, map(dict.get, jobs, repeat('company_name'))))),
             'pipeline_stages': ['Data Collection', 'Preprocessing', 'Embedding Generation', 'Job Matching'],
             'resume_length': len(resume_text)
         },
@@ -317,16 +368,17 @@ def generate_report(jobs, similarities, resume_text):
     
     # Add top 10 matches
     for i, match in enumerate(similarities[:10]):
-        job_data = match['job_data']
+        job_data = defaultdict(lambda: 'N/A', match['job_data'])
+        title, company, location, salary, skills, url = get_report_fields(job_data)
         report['top_matches'].append({
             'rank': i + 1,
-            'job_title': job_data.get('job_title', 'N/A'),
-            'company_name': job_data.get('company_name', 'N/A'),
-            'location': job_data.get('location', 'N/A'),
-            'salary_range': job_data.get('salary_range', 'N/A'),
-            'required_skills': job_data.get('required_skills', 'N/A'),
+            'job_title': title,
+            'company_name': company,
+            'location': location,
+            'salary_range': salary,
+            'required_skills': skills,
             'similarity_score': round(match['similarity_score'], 4),
-            'job_url': job_data.get('job_url', 'N/A')
+            'job_url': url
         })
     
     # Save report
@@ -351,23 +403,32 @@ def main():
     resume_text = get_user_resume()
     
     # Load St. Louis jobs
-    jobs = load_st_louis_jobs()
+    jobs, jobs_filepath = load_st_louis_jobs()
     if not jobs:
         return
     
     print(f"📊 Loaded {len(jobs)} St. Louis jobs")
     
-    # Run preprocessing
-    embedding_batch = run_preprocessing(jobs, resume_text)
-    if not embedding_batch:
-        print("❌ Preprocessing failed")
-        return
+    # Reuse preprocessed jobs if the source data hasn't changed
+    cache_path = get_job_cache_path(jobs_filepath)
+    job_embeddings = load_cached_job_embeddings(cache_path)
     
-    # Run embedding generation
-    job_embeddings, resume_embedding = run_embedding_generation(embedding_batch)
-    if not job_embeddings:
-        print("❌ Embedding generation failed")
-        return
+    if job_embeddings:
+        resume_embedding = create_resume_embedding()
+    else:
+        # Run preprocessing
+        embedding_batch = run_preprocessing(jobs, resume_text)
+        if not embedding_batch:
+            print("❌ Preprocessing failed")
+            return
+        
+        # Run embedding generation
+        job_embeddings, resume_embedding = run_embedding_generation(embedding_batch)
+        if not job_embeddings:
+            print("❌ Embedding generation failed")
+            return
+        
+        save_cached_job_embeddings(cache_path, job_embeddings)
     
     # Run job matching
     similarities = run_job_matching(job_embeddings, resume_embedding)
@@ -11,7 +11,7 @@ import logging
 from datetime import datetime
 
 # Add src to path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from src.scrapers.indeed_scraper import IndeedScraper
 from src.scrapers.linkedin_scraper import LinkedInScraper
@@ -89,7 +89,7 @@ def scrape_single_search(keywords: str = "software engineer", max_jobs: int = 10
         
         # Clean and deduplicate
         data_processor = JobDataProcessor()
-        cleaned_jobs = data_processor.clean_job_data(all_jobs)
+        cleaned_jobs = [data_processor.clean_job_data(job) for job in all_jobs]
         unique_jobs = data_processor.remove_duplicates(cleaned_jobs)
         
         print(f"✅ After cleaning: {len(unique_jobs)} unique jobs")
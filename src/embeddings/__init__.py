@@ -5,6 +5,8 @@ Embedding generation modules for the AI-Powered Job Matching System.
 from .embedding_generator import EmbeddingGenerator
 from .openai_embedder import OpenAIEmbedder
 from .embedding_manager import EmbeddingManager
-from .similarity_calculator import SimilarityCalculator
+from .similarity_calculator import SimilarityCalculator, QuantizedEmbedding
+from .embedding_cache import EmbeddingCache
+from .batching_embedder import BatchingEmbedder
 
-__all__ = ['EmbeddingGenerator', 'OpenAIEmbedder', 'EmbeddingManager', 'SimilarityCalculator'] 
\ No newline at end of file
+__all__ = ['EmbeddingGenerator', 'OpenAIEmbedder', 'EmbeddingManager', 'SimilarityCalculator', 'QuantizedEmbedding', 'EmbeddingCache', 'BatchingEmbedder'] 
\ No newline at end of file
@@ -0,0 +1,109 @@
+"""
+Micro-batching of concurrent single-text embedding requests.
+"""
+
+import asyncio
+import logging
+from typing import List, Optional, Tuple
+
+from .openai_embedder import OpenAIEmbedder
+
+logger = logging.getLogger(__name__)
+
+class BatchingEmbedder:
+    """Coalesces concurrent embed_text calls into shared embedding API requests."""
+    
+    def __init__(self, embedder: OpenAIEmbedder, max_batch_size: int = 100, max_wait: float = 0.005):
+        """
+        Initialize batching embedder.
+        
+        Args:
+            embedder: Embedder used to send the combined requests
+            max_batch_size: Maximum number of texts per API request
+            max_wait: Seconds to wait for more texts after the first one arrives
+        """
+        self.embedder = embedder
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def _ensure_worker(self):
+        """Start the background worker on the running event loop if it isn't already."""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+    
+    async def embed_text(self, text: str) -> List[float]:
+        """
+        Embed a single text, sharing the API request with other pending calls.
+        
+        Args:
+            text: Text to embed
+        
+        Returns:
+            Embedding vector as list of floats (empty if the request failed)
+        """
+        if not text or not text.strip():
+            logger.warning("Empty text provided for embedding")
+            return []
+        
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put((text, future))
+        return await future
+    
+    async def _next_batch(self) -> List[Tuple[str, asyncio.Future]]:
+        """
+        Wait for a pending text, then collect more until the batch is full or max_wait passes.
+        
+        Returns:
+            List of (text, future) pairs
+        """
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+        
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        
+        return batch
+    
+    async def _run(self):
+        """Drain the queue into batched API requests and resolve each caller's future."""
+        while True:
+            batch = await self._next_batch()
+            texts = [text for text, _ in batch]
+            
+            try:
+                embeddings = await self.embedder.aembed_batch(texts, self.max_batch_size, max_concurrency=1)
+            except Exception as e:
+                logger.error(f"Failed to embed micro-batch of {len(texts)} texts: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            logger.debug(f"Embedded micro-batch of {len(texts)} texts")
+            for (_, future), embedding in zip(batch, embeddings):
+                if not future.done():
+                    future.set_result(embedding)
+    
+    async def close(self):
+        """Stop the background worker."""
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
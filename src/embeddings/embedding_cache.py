@@ -0,0 +1,156 @@
+"""
+Persistent content-addressed cache for text embeddings.
+"""
+
+import sqlite3
+import hashlib
+import logging
+import numpy as np
+from collections import OrderedDict
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingCache:
+    """Caches embedding vectors on disk, keyed by a hash of the model and text."""
+    
+    # SQLite limits the number of bound parameters per statement
+    MAX_QUERY_PARAMS = 500
+    
+    def __init__(self, db_path: str, memory_size: int = 1024):
+        """
+        Initialize embedding cache.
+        
+        Args:
+            db_path: Path to the SQLite cache database
+            memory_size: Number of recently used vectors to also keep in memory
+        """
+        self.db_path = db_path
+        self.memory_size = memory_size
+        self._memory = OrderedDict()
+        
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings "
+            "(hash BLOB PRIMARY KEY, model TEXT, vec BLOB)"
+        )
+        self.conn.commit()
+        
+        logger.info(f"Initialized embedding cache: {db_path}")
+    
+    def _key(self, model: str, text: str) -> bytes:
+        """
+        Generate the cache key for a text embedded with a model.
+        
+        Args:
+            model: Model used for embedding
+            text: Text that was embedded
+        
+        Returns:
+            SHA-256 digest of the model and text
+        """
+        return hashlib.sha256(f"{model}\0{text}".encode('utf-8')).digest()
+    
+    def _remember(self, key: bytes, embedding: List[float]):
+        """Add a vector to the in-memory layer, evicting the least recently used."""
+        self._memory[key] = embedding
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+    
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Look up cached embeddings for several texts.
+        
+        Args:
+            model: Model used for embedding
+            texts: Texts to look up
+        
+        Returns:
+            List with the cached embedding for each text, or None on a miss
+        """
+        keys = [self._key(model, text) for text in texts]
+        found = {}
+        
+        # Serve what we can from memory, then query the rest from disk
+        missing_keys = []
+        for key in keys:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                found[key] = self._memory[key]
+            else:
+                missing_keys.append(key)
+        
+        missing_keys = list(dict.fromkeys(missing_keys))
+        for i in range(0, len(missing_keys), self.MAX_QUERY_PARAMS):
+            chunk = missing_keys[i:i + self.MAX_QUERY_PARAMS]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT hash, vec FROM embeddings WHERE hash IN ({placeholders})", chunk
+            )
+            for key, vec in rows:
+                embedding = np.frombuffer(vec, dtype=np.float32).tolist()
+                found[key] = embedding
+                self._remember(key, embedding)
+        
+        logger.debug(f"Embedding cache: {len(found)} hits for {len(texts)} texts")
+        return [found.get(key) for key in keys]
+    
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        """
+        Look up the cached embedding for a single text.
+        
+        Args:
+            model: Model used for embedding
+            text: Text to look up
+        
+        Returns:
+            Cached embedding, or None on a miss
+        """
+        return self.get_many(model, [text])[0]
+    
+    def put_many(self, model: str, texts: List[str], embeddings: List[List[float]]):
+        """
+        Store embeddings for several texts. Empty embeddings are skipped.
+        
+        Args:
+            model: Model used for embedding
+            texts: Texts that were embedded
+            embeddings: Embedding vector for each text
+        """
+        rows = []
+        for text, embedding in zip(texts, embeddings):
+            if not len(embedding):
+                continue
+            key = self._key(model, text)
+            rows.append((key, model, np.asarray(embedding, dtype=np.float32).tobytes()))
+            self._remember(key, embedding)
+        
+        if rows:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (hash, model, vec) VALUES (?, ?, ?)", rows
+                )
+            logger.debug(f"Cached {len(rows)} embeddings")
+    
+    def put(self, model: str, text: str, embedding: List[float]):
+        """
+        Store the embedding for a single text.
+        
+        Args:
+            model: Model used for embedding
+            text: Text that was embedded
+            embedding: Embedding vector
+        """
+        self.put_many(model, [text], [embedding])
+    
+    def clear(self):
+        """Remove all cached embeddings."""
+        with self.conn:
+            self.conn.execute("DELETE FROM embeddings")
+        self._memory.clear()
+        logger.info("Cleared embedding cache")
+    
+    def close(self):
+        """Close the cache database."""
+        self.conn.close()
@@ -4,14 +4,23 @@ Main embedding generator that coordinates the complete embedding pipeline.
 
 import os
 import json
+import asyncio
 import logging
 import numpy as np
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Union
 from datetime import datetime
+from itertools import compress
 
 from .openai_embedder import OpenAIEmbedder
 from .embedding_manager import EmbeddingManager
 from .similarity_calculator import SimilarityCalculator
+from .embedding_cache import EmbeddingCache
+from .batching_embedder import BatchingEmbedder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +28,7 @@ class EmbeddingGenerator:
     """Main class that coordinates embedding generation, storage, and similarity calculations."""
     
     def __init__(self, api_key: str = None, model: str = "text-embedding-3-small", 
-                 storage_dir: str = "data/embeddings"):
+                 storage_dir: str = "data/embeddings", use_cache: bool = True):
         """
         Initialize embedding generator.
         
@@ -27,52 +36,178 @@ class EmbeddingGenerator:
             api_key: OpenAI API key
             model: Embedding model to use
             storage_dir: Directory for storing embeddings
+            use_cache: Reuse embeddings of previously seen texts instead of re-requesting them
         """
         self.embedder = OpenAIEmbedder(api_key, model)
+        self.batcher = BatchingEmbedder(self.embedder)
         self.manager = EmbeddingManager(storage_dir)
         self.calculator = SimilarityCalculator()
+        self.cache = EmbeddingCache(os.path.join(storage_dir, "embedding_cache.db")) if use_cache else None
+        
+        # Job matrix, metadata and norms, reused until the stored embeddings change
+        self._jobs_cache = {'mtime': None, 'matrix': None, 'meta': None, 'norms': None}
         
         logger.info(f"Initialized embedding generator with model: {model}")
     
-    def generate_job_embeddings(self, jobs_data: List[Dict[str, Any]], 
-                              batch_size: int = 100) -> List[str]:
+    def _collect_embedding_texts(self, jobs_data: List[Dict[str, Any]]) -> Tuple[List[str], List[Dict[str, Any]]]:
         """
-        Generate embeddings for job data.
+        Collect embedding texts from job data, skipping jobs without one.
         
         Args:
             jobs_data: List of preprocessed job data
-            batch_size: Batch size for embedding generation
             
         Returns:
-            List of embedding IDs
+            Tuple of (embedding_texts, valid_jobs)
         """
         if not jobs_data:
             logger.warning("No job data provided for embedding generation")
-            return []
+            return [], []
         
         logger.info(f"Starting job embedding generation for {len(jobs_data)} jobs")
         
-        # Extract embedding texts
-        embedding_texts = []
-        valid_jobs = []
+        # Extract embedding texts and mask out jobs without one in a single pass
+        embedding_texts = [job.get('embedding_text', '') for job in jobs_data]
+        valid_mask = np.fromiter(map(bool, embedding_texts), dtype=bool, count=len(embedding_texts))
+        valid_jobs = jobs_data
         
-        for job in jobs_data:
-            embedding_text = job.get('embedding_text', '')
-            if embedding_text:
-                embedding_texts.append(embedding_text)
-                valid_jobs.append(job)
-            else:
-                logger.warning(f"Job missing embedding_text: {job.get('job_title', 'Unknown')}")
+        if not valid_mask.all():
+            for index in np.flatnonzero(~valid_mask):
+                logger.warning(f"Job missing embedding_text: {jobs_data[index].get('job_title', 'Unknown')}")
+            embedding_texts = list(compress(embedding_texts, valid_mask))
+            valid_jobs = list(compress(jobs_data, valid_mask))
         
         if not embedding_texts:
             logger.error("No valid embedding texts found in job data")
-            return []
+            return [], []
         
         logger.info(f"Generating embeddings for {len(embedding_texts)} valid jobs")
+        return embedding_texts, valid_jobs
+    
+    def _get_job_matrix(self) -> Tuple[np.ndarray, List[Dict[str, Any]], np.ndarray]:
+        """
+        Get the job matrix from the manager, reusing it while the stored embeddings are unchanged.
         
+        Returns:
+            Tuple of (unit-row job matrix, list of job metadata per row, original row norms)
+        """
         try:
-            # Generate embeddings
-            embeddings = self.embedder.embed_batch(embedding_texts, batch_size)
+            mtime = os.stat(self.manager.metadata_file).st_mtime_ns
+        except OSError:
+            mtime = None
+        
+        if mtime is None or mtime != self._jobs_cache['mtime']:
+            matrix, meta = self.manager.get_job_matrix()
+            self._jobs_cache = {
+                'mtime': mtime,
+                'matrix': matrix,
+                'meta': meta,
+                'norms': self.manager.get_job_norms()
+            }
+        
+        return self._jobs_cache['matrix'], self._jobs_cache['meta'], self._jobs_cache['norms']
+    
+    def _lookup_cached_embeddings(self, texts: List[str]) -> Tuple[List[Optional[List[float]]], List[str]]:
+        """
+        Look up cached embeddings for texts.
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            Tuple of (embeddings with None for cache misses, distinct texts that missed),
+            so a text repeated in the input is only requested once
+        """
+        if self.cache is None:
+            embeddings = [None] * len(texts)
+        else:
+            embeddings = self.cache.get_many(self.embedder.model, texts)
+        
+        missing = list(dict.fromkeys(text for text, embedding in zip(texts, embeddings) if embedding is None))
+        if self.cache is not None:
+            logger.info(f"Embedding cache hits: {sum(embedding is not None for embedding in embeddings)}/{len(texts)}")
+        return embeddings, missing
+    
+    def _store_new_embeddings(self, texts: List[str], embeddings: List[Optional[List[float]]],
+                              missing: List[str], new_embeddings: List[List[float]]):
+        """
+        Fill cache misses with newly generated embeddings and add them to the cache.
+        
+        Args:
+            texts: Texts being embedded
+            embeddings: Embeddings from the cache lookup, updated in place
+            missing: Distinct texts that missed the cache
+            new_embeddings: Generated embeddings for the missing texts
+        """
+        generated = dict(zip(missing, new_embeddings))
+        for i, embedding in enumerate(embeddings):
+            if embedding is None:
+                embeddings[i] = generated[texts[i]]
+        
+        if self.cache is not None:
+            self.cache.put_many(self.embedder.model, missing, new_embeddings)
+    
+    def generate_job_embeddings(self, jobs_data: List[Dict[str, Any]], 
+                              batch_size: int = 100,
+                              max_concurrency: int = 1) -> List[str]:
+        """
+        Generate embeddings for job data.
+        
+        Args:
+            jobs_data: List of preprocessed job data
+            batch_size: Batch size for embedding generation
+            max_concurrency: Maximum number of concurrent API requests (1 sends batches sequentially)
+            
+        Returns:
+            List of embedding IDs
+        """
+        if max_concurrency > 1:
+            return asyncio.run(self.agenerate_job_embeddings(jobs_data, batch_size, max_concurrency))
+        
+        embedding_texts, valid_jobs = self._collect_embedding_texts(jobs_data)
+        if not embedding_texts:
+            return []
+        
+        try:
+            # Generate embeddings, only requesting texts that are not cached
+            embeddings, missing = self._lookup_cached_embeddings(embedding_texts)
+            if missing:
+                new_embeddings = self.embedder.embed_batch(missing, batch_size, max_concurrency)
+                self._store_new_embeddings(embedding_texts, embeddings, missing, new_embeddings)
+            
+            # Save embeddings
+            embedding_ids = self.manager.save_job_embeddings(valid_jobs, embeddings, self.embedder.model)
+            
+            logger.info(f"Successfully generated and saved {len(embedding_ids)} job embeddings")
+            return embedding_ids
+            
+        except Exception as e:
+            logger.error(f"Failed to generate job embeddings: {e}")
+            raise
+    
+    async def agenerate_job_embeddings(self, jobs_data: List[Dict[str, Any]], 
+                                     batch_size: int = 100,
+                                     max_concurrency: int = 10) -> List[str]:
+        """
+        Generate embeddings for job data, sending batches concurrently.
+        
+        Args:
+            jobs_data: List of preprocessed job data
+            batch_size: Batch size for embedding generation
+            max_concurrency: Maximum number of concurrent API requests
+            
+        Returns:
+            List of embedding IDs
+        """
+        embedding_texts, valid_jobs = self._collect_embedding_texts(jobs_data)
+        if not embedding_texts:
+            return []
+        
+        try:
+            # Generate embeddings, only requesting texts that are not cached
+            embeddings, missing = self._lookup_cached_embeddings(embedding_texts)
+            if missing:
+                new_embeddings = await self.embedder.aembed_batch(missing, batch_size, max_concurrency)
+                self._store_new_embeddings(embedding_texts, embeddings, missing, new_embeddings)
             
             # Save embeddings
             embedding_ids = self.manager.save_job_embeddings(valid_jobs, embeddings, self.embedder.model)
@@ -103,8 +238,56 @@ class EmbeddingGenerator:
         logger.info("Starting resume embedding generation")
         
         try:
-            # Generate embedding
-            embedding = self.embedder.embed_text(resume_text)
+            # Generate embedding, reusing a cached one if available
+            embeddings, missing = self._lookup_cached_embeddings([resume_text])
+            if missing:
+                self._store_new_embeddings([resume_text], embeddings, missing, [self.embedder.embed_text(resume_text)])
+            embedding = embeddings[0]
+            
+            if not embedding:
+                logger.error("Failed to generate resume embedding")
+                return ""
+            
+            # Save embedding
+            embedding_id = self.manager.save_resume_embedding(
+                resume_text, embedding, self.embedder.model, metadata
+            )
+            
+            logger.info(f"Successfully generated and saved resume embedding: {embedding_id}")
+            return embedding_id
+            
+        except Exception as e:
+            logger.error(f"Failed to generate resume embedding: {e}")
+            raise
+    
+    async def agenerate_resume_embedding(self, resume_text: str, 
+                                       metadata: Dict[str, Any] = None) -> str:
+        """
+        Generate embedding for resume text, sharing API requests with concurrent callers.
+        
+        Resume texts submitted within a few milliseconds of each other are sent to the
+        API as a single batch by the generator's BatchingEmbedder.
+        
+        Args:
+            resume_text: Resume text to embed
+            metadata: Additional metadata
+            
+        Returns:
+            Embedding ID
+        """
+        if not resume_text or not resume_text.strip():
+            logger.warning("Empty resume text provided for embedding")
+            return ""
+        
+        logger.info("Starting resume embedding generation")
+        
+        try:
+            # Generate embedding, reusing a cached one if available
+            embeddings, missing = self._lookup_cached_embeddings([resume_text])
+            if missing:
+                embedding = await self.batcher.embed_text(resume_text)
+                self._store_new_embeddings([resume_text], embeddings, missing, [embedding])
+            embedding = embeddings[0]
             
             if not embedding:
                 logger.error("Failed to generate resume embedding")
@@ -156,7 +339,10 @@ class EmbeddingGenerator:
             if resume_data and 'embedding_text' in resume_data:
                 resume_embedding_id = self.generate_resume_embedding(
                     resume_data['embedding_text'],
-                    metadata={'parsed_resume': resume_data.get('parsed_resume', {})}
+                    metadata={
+                        'parsed_resume_summary': resume_data.get('parsed_resume_summary', {}),
+                        'raw_text_sha256': resume_data.get('raw_text_sha256')
+                    }
                 )
                 results['resume_embedding_id'] = resume_embedding_id
             
@@ -170,8 +356,70 @@ class EmbeddingGenerator:
             logger.error(f"Failed to generate embeddings from batch: {e}")
             raise
     
+    async def agenerate_embeddings_from_batch(self, embedding_batch: Dict[str, Any], 
+                                            batch_size: int = 100,
+                                            max_concurrency: int = 10) -> Dict[str, Any]:
+        """
+        Generate embeddings from a preprocessing batch, embedding jobs and resume concurrently.
+        
+        Args:
+            embedding_batch: Embedding batch from preprocessing
+            batch_size: Batch size for job embedding generation
+            max_concurrency: Maximum number of concurrent job embedding requests
+            
+        Returns:
+            Dictionary with embedding results
+        """
+        logger.info("Starting concurrent embedding generation from preprocessing batch")
+        
+        results = {
+            'job_embedding_ids': [],
+            'resume_embedding_id': "",
+            'generated_at': datetime.now().isoformat(),
+            'model': self.embedder.model,
+            'usage_stats': {}
+        }
+        
+        try:
+            tasks = {}
+            
+            # Generate job embeddings
+            jobs_data = embedding_batch.get('jobs', [])
+            if jobs_data:
+                tasks['job_embedding_ids'] = asyncio.create_task(
+                    self.agenerate_job_embeddings(jobs_data, batch_size, max_concurrency)
+                )
+            
+            # Generate resume embedding
+            resume_data = embedding_batch.get('resume')
+            if resume_data and 'embedding_text' in resume_data:
+                tasks['resume_embedding_id'] = asyncio.create_task(
+                    self.agenerate_resume_embedding(
+                        resume_data['embedding_text'],
+                        metadata={
+                            'parsed_resume_summary': resume_data.get('parsed_resume_summary', {}),
+                            'raw_text_sha256': resume_data.get('raw_text_sha256')
+                        }
+                    )
+                )
+            
+            # Both run at once, gather returns their results in task order
+            for key, result in zip(tasks, await asyncio.gather(*tasks.values())):
+                results[key] = result
+            
+            # Get usage statistics
+            results['usage_stats'] = self.embedder.get_usage_stats()
+            
+            logger.info("Embedding generation from batch completed successfully")
+            return results
+            
+        except Exception as e:
+            logger.error(f"Failed to generate embeddings from batch: {e}")
+            raise
+    
     def find_similar_jobs(self, resume_embedding_id: str, top_k: int = 10, 
-                         similarity_metric: str = 'cosine_similarity') -> List[Dict[str, Any]]:
+                         similarity_metric: str = 'cosine_similarity',
+                         quantized: bool = False) -> List[Dict[str, Any]]:
         """
         Find jobs similar to a resume embedding.
         
@@ -179,6 +427,7 @@ class EmbeddingGenerator:
             resume_embedding_id: Resume embedding ID
             top_k: Number of top similar jobs to return
             similarity_metric: Similarity metric to use
+            quantized: Score cosine/dot product against the int8 job matrix (approximate, 4x less memory)
             
         Returns:
             List of similar job results with similarity scores
@@ -193,79 +442,101 @@ class EmbeddingGenerator:
         
         resume_embedding = resume_data['embedding']
         
-        # Get all job embeddings
-        job_embeddings_data = self.manager.get_job_embeddings()
-        if not job_embeddings_data:
+        # Get all job embeddings as one float32 matrix with a parallel metadata list
+        job_matrix, job_metadata, job_norms = self._get_job_matrix()
+        if not job_metadata:
             logger.warning("No job embeddings found")
             return []
         
-        # Extract embeddings and metadata
-        job_embeddings = []
-        job_metadata = []
-        
-        for embedding_id, embedding_data in job_embeddings_data:
-            if embedding_data and embedding_data.get('embedding'):
-                job_embeddings.append(embedding_data['embedding'])
-                job_metadata.append({
-                    'embedding_id': embedding_id,
-                    'text': embedding_data.get('text', ''),
-                    'job_title': embedding_data.get('metadata', {}).get('job_title', ''),
-                    'company_name': embedding_data.get('metadata', {}).get('company_name', ''),
-                    'location': embedding_data.get('metadata', {}).get('location', ''),
-                    'job_index': embedding_data.get('metadata', {}).get('job_index', -1)
-                })
-        
-        if not job_embeddings:
-            logger.warning("No valid job embeddings found")
+        query = np.asarray(resume_embedding, dtype=np.float32)
+        if query.shape[0] != job_matrix.shape[1]:
+            logger.error("Resume and job embedding dimensions don't match")
             return []
         
-        # Find most similar jobs
-        similar_indices = self.calculator.find_most_similar(
-            resume_embedding, job_embeddings, similarity_metric, top_k
-        )
+        # Large job sets are searched approximately through the HNSW index, when available
+        job_index = None
+        if similarity_metric == 'cosine_similarity' and not quantized:
+            job_index = self.manager.get_job_index()
+        
+        # Score every job with a single matrix-vector product where possible
+        if job_index is not None:
+            query_norm = np.linalg.norm(query)
+            if query_norm > 0:
+                query = query / query_norm
+            scores, indices = job_index.search(query.reshape(1, -1), top_k)
+            similar_indices = [(int(index), float(score))
+                               for index, score in zip(indices[0], scores[0]) if index >= 0]
+        elif similarity_metric in ('cosine_similarity', 'dot_product'):
+            # Job rows are stored as unit vectors, so cosine only needs the query normalized
+            if quantized:
+                quantized_matrix, scales = self.manager.get_quantized_job_matrix()
+                scores = self.calculator.quantized_dot_scores(quantized_matrix, scales, query)
+            else:
+                scores = self.calculator.matrix_dot_scores(job_matrix, query)
+            if similarity_metric == 'cosine_similarity':
+                query_norm = np.linalg.norm(query)
+                if query_norm > 0:
+                    scores /= query_norm
+            else:
+                scores *= job_norms
+            
+            similar_indices = self.calculator.top_k_scores(scores, top_k)
+        else:
+            job_embeddings = job_matrix * job_norms[:, None]
+            similar_indices = self.calculator.find_most_similar(
+                query, job_embeddings, similarity_metric, top_k
+            )
         
         # Prepare results
         similar_jobs = []
         for index, similarity_score in similar_indices:
-            if index < len(job_metadata):
-                job_result = job_metadata[index].copy()
-                job_result['similarity_score'] = similarity_score
-                job_result['similarity_metric'] = similarity_metric
-                similar_jobs.append(job_result)
+            job_result = job_metadata[index].copy()
+            job_result['similarity_score'] = similarity_score
+            job_result['similarity_metric'] = similarity_metric
+            similar_jobs.append(job_result)
         
         logger.info(f"Found {len(similar_jobs)} similar jobs")
         return similar_jobs
     
-    def calculate_job_similarities(self, similarity_metric: str = 'cosine_similarity') -> np.ndarray:
+    def calculate_job_similarities(self, similarity_metric: str = 'cosine_similarity',
+                                   top_k: Optional[int] = None) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
         """
         Calculate similarity matrix for all job embeddings.
         
         Args:
             similarity_metric: Similarity metric to use
+            top_k: Only keep the top_k most similar jobs per job. For cosine similarity
+                this avoids materializing the full N x N matrix.
             
         Returns:
-            Similarity matrix as numpy array
+            Similarity matrix as numpy array, or a tuple of ([N, k] indices, [N, k] scores)
+            when top_k is given
         """
         logger.info("Calculating job similarity matrix")
         
         # Get all job embeddings
-        job_embeddings_data = self.manager.get_job_embeddings()
-        if not job_embeddings_data:
+        job_matrix, _, job_norms = self._get_job_matrix()
+        if job_matrix.shape[0] == 0:
             logger.warning("No job embeddings found")
             return np.array([])
         
-        # Extract embeddings
-        job_embeddings = []
-        for embedding_id, embedding_data in job_embeddings_data:
-            if embedding_data and embedding_data.get('embedding'):
-                job_embeddings.append(embedding_data['embedding'])
+        if similarity_metric == 'cosine_similarity' and top_k:
+            # Reduce each tile of the similarity matrix to its top_k as it is computed
+            top_indices, top_values = self.calculator.top_k_similarity_matrix(job_matrix, top_k)
+            logger.info(f"Calculated top {top_indices.shape[1]} similar jobs for {top_indices.shape[0]} jobs")
+            return top_indices, top_values
         
-        if not job_embeddings:
-            logger.warning("No valid job embeddings found")
-            return np.array([])
+        if similarity_metric == 'cosine_similarity':
+            # Job rows are stored as unit vectors, so cosine similarity is a single matmul
+            similarity_matrix = job_matrix @ job_matrix.T
+        else:
+            job_embeddings = (job_matrix * job_norms[:, None]).tolist()
+            similarity_matrix = self.calculator.batch_similarity_matrix(job_embeddings, similarity_metric)
         
-        # Calculate similarity matrix
-        similarity_matrix = self.calculator.batch_similarity_matrix(job_embeddings, similarity_metric)
+        if top_k and similarity_matrix.size:
+            k = min(top_k, similarity_matrix.shape[1])
+            top_indices = np.argsort(-similarity_matrix, axis=1, kind='stable')[:, :k].astype(np.int32)
+            return top_indices, np.take_along_axis(similarity_matrix, top_indices, axis=1)
         
         logger.info(f"Calculated similarity matrix: {similarity_matrix.shape}")
         return similarity_matrix
@@ -280,23 +551,26 @@ class EmbeddingGenerator:
         # Get storage statistics
         storage_stats = self.manager.get_storage_stats()
         
-        # Get job embeddings for analysis
-        job_embeddings_data = self.manager.get_job_embeddings()
-        job_embeddings = []
-        for embedding_id, embedding_data in job_embeddings_data:
-            if embedding_data and embedding_data.get('embedding'):
-                job_embeddings.append(embedding_data['embedding'])
+        # Job statistics come straight from the stored row norms of the job matrix
+        job_matrix, _, job_norms = self._get_job_matrix()
+        if job_matrix.shape[0]:
+            job_stats = {
+                'count': job_matrix.shape[0],
+                'valid_count': job_matrix.shape[0],
+                'dimensions': job_matrix.shape[1],
+                'mean_norm': float(job_norms.mean()),
+                'std_norm': float(job_norms.std()),
+                'min_norm': float(job_norms.min()),
+                'max_norm': float(job_norms.max())
+            }
+        else:
+            job_stats = self.calculator.calculate_embedding_statistics([])
         
         # Get resume embedding for analysis
         resume_data = self.manager.get_resume_embedding()
-        resume_embedding = []
-        if resume_data:
-            embedding_data = resume_data[1]
-            if embedding_data and embedding_data.get('embedding'):
-                resume_embedding = embedding_data['embedding']
+        resume_embedding = resume_data[1]['embedding'] if resume_data else []
         
-        # Calculate embedding statistics
-        job_stats = self.calculator.calculate_embedding_statistics(job_embeddings)
+        # Calculate resume embedding statistics
         resume_stats = self.calculator.calculate_embedding_statistics([resume_embedding]) if resume_embedding else {}
         
         # Get API usage statistics
@@ -310,6 +584,20 @@ class EmbeddingGenerator:
             'model': self.embedder.model
         }
     
+    def _text_preview(self, text: Optional[str], limit: int = 200) -> str:
+        """
+        Truncate text for display in reports.
+        
+        Args:
+            text: Text to preview
+            limit: Maximum number of characters to keep
+            
+        Returns:
+            Text truncated to limit characters, with "..." appended if it was cut
+        """
+        text = text or ''
+        return text[:limit] + "..." if len(text) > limit else text
+    
     def export_embeddings_report(self, output_file: str = None) -> str:
         """
         Export a comprehensive embeddings report.
@@ -328,21 +616,21 @@ class EmbeddingGenerator:
         stats = self.get_embedding_statistics()
         
         # Get job embeddings with metadata
-        job_embeddings_data = self.manager.get_job_embeddings()
+        job_matrix, job_metadata, _ = self._get_job_matrix()
+        stored_embeddings = self.manager.get_all_embeddings()
         jobs_info = []
         
-        for embedding_id, embedding_data in job_embeddings_data:
-            if embedding_data:
-                job_info = {
-                    'embedding_id': embedding_id,
-                    'job_title': embedding_data.get('metadata', {}).get('job_title', ''),
-                    'company_name': embedding_data.get('metadata', {}).get('company_name', ''),
-                    'location': embedding_data.get('metadata', {}).get('location', ''),
-                    'dimension': embedding_data.get('dimension', 0),
-                    'created_at': embedding_data.get('created_at', ''),
-                    'text_preview': embedding_data.get('text', '')[:200] + "..." if len(embedding_data.get('text', '')) > 200 else embedding_data.get('text', '')
-                }
-                jobs_info.append(job_info)
+        for job in job_metadata:
+            job_info = {
+                'embedding_id': job['embedding_id'],
+                'job_title': job['job_title'],
+                'company_name': job['company_name'],
+                'location': job['location'],
+                'dimension': job_matrix.shape[1],
+                'created_at': stored_embeddings.get(job['embedding_id'], {}).get('created_at', ''),
+                'text_preview': self._text_preview(job['text'])
+            }
+            jobs_info.append(job_info)
         
         # Get resume embedding info
         resume_info = {}
@@ -353,7 +641,7 @@ class EmbeddingGenerator:
                 'embedding_id': embedding_id,
                 'dimension': embedding_data.get('dimension', 0),
                 'created_at': embedding_data.get('created_at', ''),
-                'text_preview': embedding_data.get('text', '')[:200] + "..." if len(embedding_data.get('text', '')) > 200 else embedding_data.get('text', '')
+                'text_preview': self._text_preview(embedding_data.get('text'))
             }
         
         # Create report
@@ -367,8 +655,12 @@ class EmbeddingGenerator:
         
         # Save report
         try:
-            with open(output_file, 'w') as f:
-                json.dump(report, f, indent=2)
+            if orjson is not None:
+                with open(output_file, 'wb') as f:
+                    f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+            else:
+                with open(output_file, 'w') as f:
+                    json.dump(report, f, indent=2)
             logger.info(f"Exported embedding report to {output_file}")
             return output_file
         except Exception as e:
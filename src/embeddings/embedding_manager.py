@@ -11,11 +11,27 @@ from typing import List, Dict, Any, Optional, Union, Tuple
 from datetime import datetime
 import hashlib
 
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 class EmbeddingManager:
     """Manages storage, retrieval, and operations on embeddings."""
     
+    # Below this many jobs an exact scan is fast enough that an ANN index isn't worth it
+    ANN_MIN_JOBS = 5000
+    HNSW_NEIGHBORS = 32
+    # Rows allocated in the vector file the first time it is created; it doubles when full
+    INITIAL_VECTOR_CAPACITY = 1024
+    
     def __init__(self, storage_dir: str = "data/embeddings"):
         """
         Initialize embedding manager.
@@ -26,10 +42,35 @@ class EmbeddingManager:
         self.storage_dir = storage_dir
         self.ensure_storage_dir()
         
+        # Bumped on every in-memory change to the embeddings; compared with the version
+        # last written to disk, so unflushed changes still invalidate the job matrix
+        self._embeddings_version = 0
+        self._saved_embeddings_version = 0
+        
         # Metadata file
         self.metadata_file = os.path.join(storage_dir, "metadata.json")
         self.metadata = self.load_metadata()
         
+        # All embedding vectors live in one float32 (capacity, dimension) memory-mapped file
+        self.vectors_file = os.path.join(storage_dir, "vectors.f32")
+        self.vectors = self._open_vectors()
+        self._migrate_legacy_embeddings()
+        
+        # Resume IDs in insertion order, so resume lookups and stats don't scan every entry
+        self._resume_ids = dict.fromkeys(
+            embedding_id for embedding_id, entry in self.metadata['embeddings'].items()
+            if entry.get('type') == 'resume'
+        )
+        
+        # Job embeddings stacked into a single float32 matrix for fast search
+        self.job_matrix_file = os.path.join(storage_dir, "jobs.npy")
+        self.job_matrix_meta_file = os.path.join(storage_dir, "jobs_meta.json")
+        self.job_norms_file = os.path.join(storage_dir, "jobs_norms.npy")
+        self.job_int8_file = os.path.join(storage_dir, "jobs_int8.npy")
+        self.job_scales_file = os.path.join(storage_dir, "jobs_scales.npy")
+        self.job_index_file = os.path.join(storage_dir, "index.faiss")
+        self._job_matrix_cache = None
+        
         logger.info(f"Initialized embedding manager with storage directory: {storage_dir}")
     
     def ensure_storage_dir(self):
@@ -45,8 +86,12 @@ class EmbeddingManager:
         """
         if os.path.exists(self.metadata_file):
             try:
-                with open(self.metadata_file, 'r') as f:
-                    metadata = json.load(f)
+                if orjson is not None:
+                    with open(self.metadata_file, 'rb') as f:
+                        metadata = orjson.loads(f.read())
+                else:
+                    with open(self.metadata_file, 'r', encoding='utf-8') as f:
+                        metadata = json.load(f)
                 logger.info(f"Loaded metadata: {len(metadata.get('embeddings', {}))} embeddings tracked")
                 return metadata
             except Exception as e:
@@ -62,9 +107,15 @@ class EmbeddingManager:
         """Save metadata to file."""
         self.metadata['last_updated'] = datetime.now().isoformat()
         
+        # Written compactly and as UTF-8, since it holds every embedded text and is rewritten on each save
         try:
-            with open(self.metadata_file, 'w') as f:
-                json.dump(self.metadata, f, indent=2)
+            if orjson is not None:
+                with open(self.metadata_file, 'wb') as f:
+                    f.write(orjson.dumps(self.metadata))
+            else:
+                with open(self.metadata_file, 'w', encoding='utf-8') as f:
+                    json.dump(self.metadata, f, separators=(',', ':'), ensure_ascii=False)
+            self._saved_embeddings_version = self._embeddings_version
             logger.debug("Metadata saved successfully")
         except Exception as e:
             logger.error(f"Failed to save metadata: {e}")
@@ -80,108 +131,267 @@ class EmbeddingManager:
         Returns:
             Unique embedding ID
         """
-        # Create a hash of the text and model
-        content = f"{text[:100]}_{model}"  # Use first 100 chars for efficiency
-        return hashlib.md5(content.encode()).hexdigest()
+        # Hash the full text, since job postings often share long boilerplate prefixes
+        content = f"{model}|{text}"
+        return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
     
-    def _get_embedding_filename(self, embedding_id: str) -> str:
+    def _open_vectors(self) -> Optional[np.memmap]:
         """
-        Get filename for embedding storage.
+        Open the vector file as a writable memory map.
+        
+        Returns:
+            (capacity, dimension) float32 memmap, or None if no vectors are stored yet
+        """
+        dimension = self.metadata.get('vector_dimension')
+        capacity = self.metadata.get('vector_capacity', 0)
+        if not dimension or not capacity or not os.path.exists(self.vectors_file):
+            return None
+        
+        return np.memmap(self.vectors_file, dtype=np.float32, mode='r+', shape=(capacity, dimension))
+    
+    def _grow_vectors(self, capacity: int):
+        """
+        Extend the vector file to hold capacity rows and re-open the memory map.
+        
+        Args:
+            capacity: New number of rows
+        """
+        if self.vectors is not None:
+            self.vectors.flush()
+        
+        with open(self.vectors_file, 'ab') as f:
+            f.truncate(capacity * self.metadata['vector_dimension'] * np.dtype(np.float32).itemsize)
+        
+        self.metadata['vector_capacity'] = capacity
+        self.vectors = self._open_vectors()
+        logger.debug(f"Grew vector storage to {capacity} rows")
+    
+    def _allocate_row(self, dimension: int) -> int:
+        """
+        Reserve a row in the vector file, growing it if it is full.
+        
+        Args:
+            dimension: Dimension of the embedding to store
+            
+        Returns:
+            Row index for the new embedding
+        """
+        stored_dimension = self.metadata.setdefault('vector_dimension', dimension)
+        if dimension != stored_dimension:
+            raise ValueError(f"Embedding dimension {dimension} doesn't match stored dimension {stored_dimension}")
+        
+        # Rows of deleted embeddings are reused first
+        free_rows = self.metadata.setdefault('free_rows', [])
+        if free_rows:
+            return free_rows.pop()
+        
+        row = self.metadata.get('vector_count', 0)
+        capacity = self.metadata.get('vector_capacity', 0)
+        if row >= capacity:
+            self._grow_vectors(max(self.INITIAL_VECTOR_CAPACITY, capacity * 2))
+        
+        self.metadata['vector_count'] = row + 1
+        return row
+    
+    def _write_vector(self, embedding_id: str, embedding: np.ndarray) -> int:
+        """
+        Write an embedding vector to its row, allocating one if it doesn't have one yet.
         
         Args:
             embedding_id: Unique embedding ID
+            embedding: float32 embedding vector
             
         Returns:
-            Filename for the embedding
+            Row index the vector was written to
         """
-        return os.path.join(self.storage_dir, f"{embedding_id}.pkl")
+        entry = self.metadata['embeddings'].get(embedding_id, {})
+        row = entry['row'] if 'row' in entry else self._allocate_row(embedding.shape[0])
+        
+        self.vectors[row] = embedding
+        return row
     
-    def save_embedding(self, text: str, embedding: List[float], model: str, 
-                      metadata: Dict[str, Any] = None) -> str:
+    def _migrate_legacy_embeddings(self):
+        """Move embeddings stored as per-embedding .pkl or .bin/.json files into the vector file."""
+        legacy_ids = [embedding_id for embedding_id, entry in self.metadata['embeddings'].items()
+                      if 'row' not in entry]
+        if not legacy_ids:
+            return
+        
+        for embedding_id in legacy_ids:
+            base = os.path.join(self.storage_dir, embedding_id)
+            try:
+                if os.path.exists(f"{base}.bin"):
+                    with open(f"{base}.json", 'r') as f:
+                        embedding_data = json.load(f)
+                    embedding_data['embedding'] = np.fromfile(f"{base}.bin", dtype=np.float32)
+                elif os.path.exists(f"{base}.pkl"):
+                    with open(f"{base}.pkl", 'rb') as f:
+                        embedding_data = pickle.load(f)
+                else:
+                    logger.warning(f"Embedding file not found for {embedding_id}, dropping it")
+                    del self.metadata['embeddings'][embedding_id]
+                    continue
+                
+                entry = self.metadata['embeddings'][embedding_id]
+                embedding = np.asarray(embedding_data['embedding'], dtype=np.float32)
+                entry['row'] = self._write_vector(embedding_id, embedding)
+                entry['text'] = embedding_data.get('text', '')
+                entry['metadata'] = embedding_data.get('metadata', {})
+                entry['type'] = entry['metadata'].get('type')
+                entry['filename'] = self.vectors_file
+                
+                for extension in ('bin', 'json', 'pkl'):
+                    if os.path.exists(f"{base}.{extension}"):
+                        os.remove(f"{base}.{extension}")
+            except Exception as e:
+                logger.error(f"Failed to migrate embedding {embedding_id}: {e}")
+        
+        if self.vectors is not None:
+            self.vectors.flush()
+        self.save_metadata()
+        logger.info(f"Migrated {len(legacy_ids)} embeddings into {self.vectors_file}")
+    
+    def flush(self):
+        """Write pending vector and metadata changes to disk."""
+        if self.vectors is not None:
+            self.vectors.flush()
+        self.save_metadata()
+    
+    def _record_embedding(self, embedding_id: str, text: str, model: str, dimension: int,
+                          metadata: Optional[Dict[str, Any]]) -> int:
         """
-        Save an embedding to storage.
+        Create or replace the metadata entry for an embedding.
         
         Args:
+            embedding_id: Unique embedding ID
             text: Original text that was embedded
-            embedding: Embedding vector
             model: Model used for embedding
+            dimension: Embedding dimension
             metadata: Additional metadata
             
         Returns:
-            Embedding ID
+            Row of the vector file to write the embedding to
         """
-        embedding_id = self._generate_embedding_id(text, model)
-        filename = self._get_embedding_filename(embedding_id)
+        previous = self.metadata['embeddings'].get(embedding_id)
+        if previous is not None and 'row' in previous:
+            row = previous['row']
+        else:
+            row = self._allocate_row(dimension)
         
-        # Prepare embedding data
-        embedding_data = {
-            'text': text,
-            'embedding': embedding,
+        self._embeddings_version += 1
+        self._resume_ids.pop(embedding_id, None)
+        if (metadata or {}).get('type') == 'resume':
+            self._resume_ids[embedding_id] = None
+        
+        self.metadata['embeddings'][embedding_id] = {
+            'text_preview': text[:100] + "..." if len(text) > 100 else text,
             'model': model,
-            'dimension': len(embedding),
+            'dimension': dimension,
             'created_at': datetime.now().isoformat(),
+            'filename': self.vectors_file,
+            'row': row,
+            'type': (metadata or {}).get('type'),
+            'text': text,
             'metadata': metadata or {}
         }
+        return row
+    
+    def save_embedding(self, text: str, embedding: Union[List[float], np.ndarray], model: str, 
+                      metadata: Dict[str, Any] = None, flush: bool = True,
+                      explicit_id: Optional[str] = None) -> str:
+        """
+        Save an embedding to storage.
         
-        # Save embedding file
-        try:
-            with open(filename, 'wb') as f:
-                pickle.dump(embedding_data, f)
+        Args:
+            text: Original text that was embedded
+            embedding: Embedding vector, as a list or float32 array
+            model: Model used for embedding
+            metadata: Additional metadata
+            flush: Write the vector and metadata to disk now. Bulk savers pass False
+                and call flush() once at the end.
+            explicit_id: Stable ID to store the embedding under instead of hashing the text
             
-            # Update metadata
-            self.metadata['embeddings'][embedding_id] = {
-                'text_preview': text[:100] + "..." if len(text) > 100 else text,
-                'model': model,
-                'dimension': len(embedding),
-                'created_at': embedding_data['created_at'],
-                'filename': filename
-            }
-            self.save_metadata()
+        Returns:
+            Embedding ID
+        """
+        # Convert once; everything below works on the float32 array
+        embedding = np.ascontiguousarray(embedding, dtype=np.float32)
+        
+        # Stored embeddings are never empty, so readers don't need to check
+        if embedding.shape[0] == 0:
+            raise ValueError("Cannot save an empty embedding")
+        
+        embedding_id = explicit_id or self._generate_embedding_id(text, model)
+        
+        # Save embedding vector into its row of the vector file
+        try:
+            row = self._record_embedding(embedding_id, text, model, embedding.shape[0], metadata)
+            self.vectors[row] = embedding
+            if flush:
+                self.flush()
             
-            logger.info(f"Saved embedding {embedding_id} ({len(embedding)} dimensions)")
+            logger.info(f"Saved embedding {embedding_id} ({embedding.shape[0]} dimensions)")
             return embedding_id
             
         except Exception as e:
             logger.error(f"Failed to save embedding {embedding_id}: {e}")
             raise
     
-    def load_embedding(self, embedding_id: str) -> Optional[Dict[str, Any]]:
+    def load_embedding(self, embedding_id: str, as_array: bool = False) -> Optional[Dict[str, Any]]:
         """
         Load an embedding from storage.
         
         Args:
             embedding_id: Unique embedding ID
+            as_array: Return the embedding as a read-only float32 view into the vector
+                file instead of a list
             
         Returns:
             Embedding data dictionary or None if not found
         """
-        if embedding_id not in self.metadata['embeddings']:
+        entry = self.metadata['embeddings'].get(embedding_id)
+        if entry is None or 'row' not in entry:
             logger.warning(f"Embedding {embedding_id} not found in metadata")
             return None
         
-        filename = self._get_embedding_filename(embedding_id)
+        embedding = self.vectors[entry['row']]
+        if as_array:
+            embedding = embedding.view()
+            embedding.flags.writeable = False
+        else:
+            embedding = embedding.tolist()
         
-        if not os.path.exists(filename):
-            logger.warning(f"Embedding file not found: {filename}")
-            return None
+        logger.debug(f"Loaded embedding {embedding_id}")
+        return {
+            'text': entry.get('text', ''),
+            'embedding': embedding,
+            'model': entry.get('model'),
+            'dimension': entry.get('dimension'),
+            'created_at': entry.get('created_at'),
+            'metadata': entry.get('metadata', {})
+        }
+    
+    def load_embeddings(self, embedding_ids: List[str], as_array: bool = False) -> List[Optional[Dict[str, Any]]]:
+        """
+        Load several embeddings from storage.
         
-        try:
-            with open(filename, 'rb') as f:
-                embedding_data = pickle.load(f)
-            logger.debug(f"Loaded embedding {embedding_id}")
-            return embedding_data
-        except Exception as e:
-            logger.error(f"Failed to load embedding {embedding_id}: {e}")
-            return None
+        Args:
+            embedding_ids: Unique embedding IDs
+            as_array: Return the embeddings as float32 views instead of lists
+            
+        Returns:
+            List of embedding data dictionaries (None where not found), in input order
+        """
+        return [self.load_embedding(embedding_id, as_array) for embedding_id in embedding_ids]
     
     def save_job_embeddings(self, jobs_data: List[Dict[str, Any]], 
-                           embeddings: List[List[float]], model: str) -> List[str]:
+                           embeddings: Union[List[List[float]], np.ndarray], model: str) -> List[str]:
         """
         Save embeddings for multiple jobs.
         
         Args:
             jobs_data: List of job data dictionaries
-            embeddings: List of embedding vectors
+            embeddings: List of embedding vectors, or an [N, D] array
             model: Model used for embedding
             
         Returns:
@@ -190,10 +400,13 @@ class EmbeddingManager:
         if len(jobs_data) != len(embeddings):
             raise ValueError("Number of jobs and embeddings must match")
         
-        embedding_ids = []
+        texts = []
+        valid_embeddings = []
+        metadatas = []
+        explicit_ids = []
         
         for i, (job, embedding) in enumerate(zip(jobs_data, embeddings)):
-            if not embedding:  # Skip empty embeddings
+            if len(embedding) == 0:  # Skip empty embeddings
                 logger.warning(f"Skipping empty embedding for job {i}")
                 continue
             
@@ -203,24 +416,36 @@ class EmbeddingManager:
                 logger.warning(f"No embedding_text found for job {i}")
                 continue
             
+            texts.append(embedding_text)
+            valid_embeddings.append(embedding)
+            explicit_ids.append(job.get('job_id'))
+            
             # Additional metadata
-            metadata = {
+            metadatas.append({
                 'job_title': job.get('job_title', ''),
                 'company_name': job.get('company_name', ''),
                 'location': job.get('location', ''),
                 'job_index': i
-            }
-            
-            try:
-                embedding_id = self.save_embedding(embedding_text, embedding, model, metadata)
-                embedding_ids.append(embedding_id)
-            except Exception as e:
-                logger.error(f"Failed to save embedding for job {i}: {e}")
+            })
+        
+        if not texts:
+            logger.info("Saved 0 job embeddings")
+            return []
         
+        # One stacked array, written to the vector file in a single indexed assignment
+        matrix = np.asarray(valid_embeddings, dtype=np.float32)
+        
+        embedding_ids = [explicit_id or self._generate_embedding_id(text, model)
+                         for text, explicit_id in zip(texts, explicit_ids)]
+        rows = [self._record_embedding(embedding_id, text, model, matrix.shape[1], metadata)
+                for embedding_id, text, metadata in zip(embedding_ids, texts, metadatas)]
+        self.vectors[np.array(rows, dtype=np.int64)] = matrix
+        
+        self.flush()
         logger.info(f"Saved {len(embedding_ids)} job embeddings")
         return embedding_ids
     
-    def save_resume_embedding(self, resume_text: str, embedding: List[float], 
+    def save_resume_embedding(self, resume_text: str, embedding: Union[List[float], np.ndarray], 
                             model: str, metadata: Dict[str, Any] = None) -> str:
         """
         Save resume embedding.
@@ -259,14 +484,210 @@ class EmbeddingManager:
         Returns:
             List of (embedding_id, embedding_data) tuples
         """
-        job_embeddings = []
+        return [
+            (embedding_id, self.load_embedding(embedding_id))
+            for embedding_id in self.metadata['embeddings']
+            if embedding_id not in self._resume_ids
+        ]
+    
+    def _job_matrix_stamp(self) -> Tuple[Optional[str], int, Optional[int]]:
+        """
+        Identify the current version of the stored embeddings and job matrix.
+        
+        Returns:
+            Tuple of (metadata last_updated, in-memory embeddings version,
+            jobs.npy modification time or None)
+        """
+        try:
+            mtime = os.stat(self.job_matrix_file).st_mtime_ns
+        except OSError:
+            mtime = None
+        return self.metadata.get('last_updated'), self._embeddings_version, mtime
+    
+    def _save_array(self, path: str, array: np.ndarray):
+        """
+        Save an array to a .npy file by writing a new file and renaming it into place.
+        
+        Replacing rather than truncating the file keeps existing memory maps of the
+        previous version valid.
+        
+        Args:
+            path: Destination .npy path
+            array: Array to save
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, array)
+        os.replace(tmp_path, path)
+    
+    def get_job_matrix(self) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+        """
+        Get all job embeddings as a single float32 matrix of unit vectors.
+        
+        Rows are L2-normalized once when the matrix is built, so cosine similarity
+        against a unit query is a plain dot product. The original norms are kept
+        in jobs_norms.npy (see get_job_norms). The matrix is persisted to jobs.npy
+        alongside a parallel metadata list in jobs_meta.json, and is rebuilt from
+        the vector file only when the stored embeddings have changed since it
+        was written.
+        
+        Returns:
+            Tuple of (memory-mapped [N, D] float32 matrix, list of job metadata per row)
+        """
+        # Reuse the open memory map while neither the embeddings nor jobs.npy have changed
+        stamp = self._job_matrix_stamp()
+        if self._job_matrix_cache is not None and self._job_matrix_cache[0] == stamp:
+            return self._job_matrix_cache[1], self._job_matrix_cache[2]
+        
+        # The saved matrix matches only the saved metadata, so it can't serve unflushed changes,
+        # and a matrix built from them is stamped so that no saved metadata matches it
+        unflushed = self._embeddings_version != self._saved_embeddings_version
+        last_updated = None if unflushed else self.metadata.get('last_updated')
+        
+        matrix_files = (self.job_matrix_file, self.job_matrix_meta_file, self.job_norms_file,
+                        self.job_int8_file, self.job_scales_file)
+        if not unflushed and all(os.path.exists(path) for path in matrix_files):
+            try:
+                with open(self.job_matrix_meta_file, 'r') as f:
+                    matrix_meta = json.load(f)
+                if matrix_meta.get('normalized') and matrix_meta.get('last_updated') == last_updated:
+                    matrix = np.load(self.job_matrix_file, mmap_mode='r')
+                    self._job_matrix_cache = (stamp, matrix, matrix_meta['jobs'])
+                    logger.debug(f"Loaded job matrix: {matrix.shape}")
+                    return matrix, matrix_meta['jobs']
+            except Exception as e:
+                logger.warning(f"Failed to load job matrix, rebuilding: {e}")
+        
+        rows = []
+        jobs_meta = []
+        
+        for embedding_id, entry in self.metadata['embeddings'].items():
+            if entry.get('type') == 'resume':
+                continue
+            
+            metadata = entry.get('metadata', {})
+            rows.append(entry['row'])
+            jobs_meta.append({
+                'embedding_id': embedding_id,
+                'text': entry.get('text', ''),
+                'job_title': metadata.get('job_title', ''),
+                'company_name': metadata.get('company_name', ''),
+                'location': metadata.get('location', ''),
+                'job_index': metadata.get('job_index', -1)
+            })
+        
+        # Gather the job rows out of the vector file in one fancy-indexing copy
+        if rows:
+            matrix = np.asarray(self.vectors[np.array(rows, dtype=np.int64)])
+        else:
+            matrix = np.zeros((0, self.metadata.get('vector_dimension', 0)), dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1)
+        np.divide(matrix, norms[:, None], out=matrix, where=norms[:, None] > 0)
+        
+        # int8 copy of the unit rows with one scale per row, for bandwidth-bound searches
+        scales = np.abs(matrix).max(axis=1, initial=0.0) / 127
+        safe_scales = np.where(scales > 0, scales, 1.0)
+        quantized = np.rint(matrix / safe_scales[:, None]).astype(np.int8)
+        
+        try:
+            self._save_array(self.job_matrix_file, matrix)
+            self._save_array(self.job_norms_file, norms)
+            self._save_array(self.job_int8_file, quantized)
+            self._save_array(self.job_scales_file, scales.astype(np.float32))
+            with open(self.job_matrix_meta_file, 'w') as f:
+                json.dump({
+                    'last_updated': last_updated,
+                    'normalized': True,
+                    'jobs': jobs_meta
+                }, f)
+            matrix = np.load(self.job_matrix_file, mmap_mode='r')
+            self._job_matrix_cache = (self._job_matrix_stamp(), matrix, jobs_meta)
+            logger.info(f"Built job matrix: {matrix.shape}")
+        except Exception as e:
+            logger.error(f"Failed to save job matrix: {e}")
+        
+        return matrix, jobs_meta
+    
+    def get_job_norms(self) -> np.ndarray:
+        """
+        Get the original L2 norms of the rows of the job matrix.
+        
+        Returns:
+            Array of shape [N] with the norm of each job embedding before normalization
+        """
+        self.get_job_matrix()
+        return np.load(self.job_norms_file, mmap_mode='r')
+    
+    def get_quantized_job_matrix(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the int8-quantized version of the job matrix.
         
-        for embedding_id, metadata in self.metadata['embeddings'].items():
-            embedding_data = self.load_embedding(embedding_id)
-            if embedding_data and embedding_data.get('metadata', {}).get('type') != 'resume':
-                job_embeddings.append((embedding_id, embedding_data))
+        Each unit row v is stored as round(v / scale) with scale = max|v| / 127,
+        so a row is recovered as quantized * scale.
         
-        return job_embeddings
+        Returns:
+            Tuple of (memory-mapped [N, D] int8 matrix, [N] float32 per-row scales)
+        """
+        self.get_job_matrix()
+        return np.load(self.job_int8_file, mmap_mode='r'), np.load(self.job_scales_file, mmap_mode='r')
+    
+    def get_job_index(self):
+        """
+        Get an HNSW approximate nearest-neighbour index over the job matrix.
+        
+        The index uses inner product on the unit rows, so its scores are cosine
+        similarities. It is persisted to index.faiss and rebuilt whenever the job
+        matrix has been rebuilt since. Requires the optional faiss package.
+        
+        Returns:
+            faiss index, or None if faiss is unavailable or there are fewer than
+            ANN_MIN_JOBS jobs
+        """
+        matrix, _ = self.get_job_matrix()
+        if faiss is None or matrix.shape[0] < self.ANN_MIN_JOBS:
+            return None
+        
+        try:
+            if (os.path.exists(self.job_index_file)
+                    and os.path.getmtime(self.job_index_file) >= os.path.getmtime(self.job_matrix_file)):
+                index = faiss.read_index(self.job_index_file)
+                if index.ntotal == matrix.shape[0]:
+                    return index
+            
+            index = faiss.IndexHNSWFlat(matrix.shape[1], self.HNSW_NEIGHBORS, faiss.METRIC_INNER_PRODUCT)
+            index.add(np.ascontiguousarray(matrix))
+            faiss.write_index(index, self.job_index_file)
+            logger.info(f"Built HNSW index over {index.ntotal} job embeddings")
+            return index
+        except Exception as e:
+            logger.error(f"Failed to build job index: {e}")
+            return None
+    
+    def search(self, query: Union[List[float], np.ndarray], k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Find the job embeddings most cosine-similar to a query vector.
+        
+        The job matrix rows are already unit vectors, so this is one matrix-vector
+        product followed by a partial sort of the scores.
+        
+        Args:
+            query: Query embedding vector
+            k: Number of results to return
+            
+        Returns:
+            List of (embedding_id, cosine_similarity) tuples, most similar first
+        """
+        matrix, jobs_meta = self.get_job_matrix()
+        query = np.asarray(query, dtype=np.float32)
+        query_norm = np.linalg.norm(query)
+        k = min(k, matrix.shape[0])
+        if k <= 0 or query_norm == 0 or query.shape[0] != matrix.shape[1]:
+            return []
+        
+        scores = matrix @ (query / query_norm)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(jobs_meta[index]['embedding_id'], float(scores[index])) for index in top]
     
     def get_resume_embedding(self) -> Optional[Tuple[str, Dict[str, Any]]]:
         """
@@ -275,19 +696,19 @@ class EmbeddingManager:
         Returns:
             (embedding_id, embedding_data) tuple or None if not found
         """
-        for embedding_id, metadata in self.metadata['embeddings'].items():
-            embedding_data = self.load_embedding(embedding_id)
-            if embedding_data and embedding_data.get('metadata', {}).get('type') == 'resume':
-                return (embedding_id, embedding_data)
+        resume_id = next(iter(self._resume_ids), None)
+        if resume_id is None:
+            return None
         
-        return None
+        return (resume_id, self.load_embedding(resume_id))
     
-    def delete_embedding(self, embedding_id: str) -> bool:
+    def delete_embedding(self, embedding_id: str, flush: bool = True) -> bool:
         """
         Delete an embedding from storage.
         
         Args:
             embedding_id: Unique embedding ID
+            flush: Write the change to disk now
             
         Returns:
             True if deleted successfully, False otherwise
@@ -296,16 +717,18 @@ class EmbeddingManager:
             logger.warning(f"Embedding {embedding_id} not found in metadata")
             return False
         
-        filename = self._get_embedding_filename(embedding_id)
-        
         try:
-            # Delete file
-            if os.path.exists(filename):
-                os.remove(filename)
+            # Clear the vector's row and make it available for reuse
+            row = self.metadata['embeddings'][embedding_id]['row']
+            self.vectors[row] = 0
+            self.metadata.setdefault('free_rows', []).append(row)
             
             # Remove from metadata
             del self.metadata['embeddings'][embedding_id]
-            self.save_metadata()
+            self._resume_ids.pop(embedding_id, None)
+            self._embeddings_version += 1
+            if flush:
+                self.flush()
             
             logger.info(f"Deleted embedding {embedding_id}")
             return True
@@ -319,7 +742,8 @@ class EmbeddingManager:
         try:
             # Delete all embedding files
             for embedding_id in list(self.metadata['embeddings'].keys()):
-                self.delete_embedding(embedding_id)
+                self.delete_embedding(embedding_id, flush=False)
+            self.flush()
             
             logger.info("Cleared all embeddings")
         except Exception as e:
@@ -333,14 +757,12 @@ class EmbeddingManager:
             Dictionary with storage statistics
         """
         total_embeddings = len(self.metadata['embeddings'])
-        job_embeddings = len([e for e in self.metadata['embeddings'].values() 
-                            if e.get('metadata', {}).get('type') != 'resume'])
-        resume_embeddings = total_embeddings - job_embeddings
+        resume_embeddings = len(self._resume_ids)
+        job_embeddings = total_embeddings - resume_embeddings
         
         # Calculate total storage size
         total_size = 0
-        for embedding_id in self.metadata['embeddings']:
-            filename = self._get_embedding_filename(embedding_id)
+        for filename in (self.vectors_file, self.metadata_file):
             if os.path.exists(filename):
                 total_size += os.path.getsize(filename)
         
@@ -358,40 +780,65 @@ class EmbeddingManager:
         """
         Export all embeddings to a file.
         
+        The 'npy' format writes the vectors as a single [N, D] float32 .npy file,
+        with the IDs and records for each row in a <name>_meta.json file alongside.
+        
         Args:
             output_file: Output file path
-            format: Export format ('json' or 'pickle')
+            format: Export format ('json', 'pickle' or 'npy')
         """
-        all_embeddings = {}
+        format = format.lower()
+        if format not in ('json', 'pickle', 'npy'):
+            raise ValueError(f"Unsupported format: {format}")
         
-        for embedding_id in self.metadata['embeddings']:
-            embedding_data = self.load_embedding(embedding_id)
-            if embedding_data:
-                all_embeddings[embedding_id] = embedding_data
+        embedding_ids = list(self.metadata['embeddings'])
         
         try:
-            if format.lower() == 'json':
-                # Convert numpy arrays to lists for JSON serialization
-                export_data = {}
-                for embedding_id, data in all_embeddings.items():
-                    export_data[embedding_id] = {
-                        'text': data['text'],
-                        'embedding': data['embedding'],
-                        'model': data['model'],
-                        'dimension': data['dimension'],
-                        'created_at': data['created_at'],
-                        'metadata': data['metadata']
-                    }
+            if format == 'npy':
+                rows = np.array([self.metadata['embeddings'][embedding_id]['row'] for embedding_id in embedding_ids],
+                                dtype=np.int64)
+                if len(rows):
+                    vectors = np.asarray(self.vectors[rows])
+                else:
+                    vectors = np.zeros((0, self.metadata.get('vector_dimension', 0)), dtype=np.float32)
+                with open(output_file, 'wb') as f:
+                    np.lib.format.write_array(f, vectors)
+                
+                records = []
+                for embedding_id in embedding_ids:
+                    entry = self.metadata['embeddings'][embedding_id]
+                    records.append({
+                        'embedding_id': embedding_id,
+                        'text': entry.get('text', ''),
+                        'model': entry.get('model'),
+                        'created_at': entry.get('created_at'),
+                        'metadata': entry.get('metadata', {})
+                    })
+                with open(f"{os.path.splitext(output_file)[0]}_meta.json", 'w', encoding='utf-8') as f:
+                    json.dump(records, f, separators=(',', ':'), ensure_ascii=False)
                 
-                with open(output_file, 'w') as f:
-                    json.dump(export_data, f, indent=2)
+                logger.info(f"Exported {len(records)} embeddings to {output_file}")
+                return
             
-            elif format.lower() == 'pickle':
-                with open(output_file, 'wb') as f:
-                    pickle.dump(all_embeddings, f)
+            # Float32 arrays are pickled as raw buffers and serialized natively by orjson
+            as_array = format == 'pickle' or orjson is not None
+            all_embeddings = {}
+            for embedding_id, embedding_data in zip(embedding_ids, self.load_embeddings(embedding_ids, as_array)):
+                if embedding_data:
+                    if as_array:
+                        embedding_data['embedding'] = np.array(embedding_data['embedding'])
+                    all_embeddings[embedding_id] = embedding_data
             
+            if format == 'json':
+                if orjson is not None:
+                    with open(output_file, 'wb') as f:
+                        f.write(orjson.dumps(all_embeddings, option=orjson.OPT_SERIALIZE_NUMPY))
+                else:
+                    with open(output_file, 'w', encoding='utf-8') as f:
+                        json.dump(all_embeddings, f, separators=(',', ':'), ensure_ascii=False)
             else:
-                raise ValueError(f"Unsupported format: {format}")
+                with open(output_file, 'wb') as f:
+                    pickle.dump(all_embeddings, f, protocol=5)
             
             logger.info(f"Exported {len(all_embeddings)} embeddings to {output_file}")
             
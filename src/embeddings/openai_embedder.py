@@ -4,12 +4,26 @@ OpenAI Embedding API integration for generating text embeddings.
 
 import os
 import time
+import base64
+import asyncio
 import logging
 import json
-from typing import List, Dict, Any, Optional, Union
+import numpy as np
+from typing import List, Dict, Any, Optional, Union, Tuple
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
 logger = logging.getLogger(__name__)
 
 class OpenAIEmbedder:
@@ -34,12 +48,22 @@ class OpenAIEmbedder:
             "Content-Type": "application/json"
         }
         
+        # Reuse TLS connections across requests; the pool covers the concurrent batch requests
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=0)
+        self.session.mount("https://", adapter)
+        
         # Rate limiting settings
         self.requests_per_minute = 3500  # OpenAI's limit for text-embedding-3-small
         self.requests_per_minute_large = 500  # OpenAI's limit for text-embedding-3-large
         self.max_retries = 3
         self.base_delay = 1  # Base delay in seconds
         
+        # Request size limits
+        self.max_batch_tokens = 250000  # Kept under OpenAI's 300K tokens per embeddings request
+        self._encoding = None  # tiktoken encoding, loaded on first use
+        
         # Track API usage
         self.request_count = 0
         self.last_request_time = 0
@@ -67,16 +91,22 @@ class OpenAIEmbedder:
         cost_per_1k = self.cost_per_1k_tokens.get(self.model, 0.00002)
         return (tokens / 1000) * cost_per_1k
     
+    def _min_request_interval(self) -> float:
+        """
+        Get the minimum interval between requests for the current model.
+        
+        Returns:
+            Minimum interval in seconds
+        """
+        if "large" in self.model:
+            return 60.0 / self.requests_per_minute_large
+        return 60.0 / self.requests_per_minute
+    
     def _rate_limit_delay(self):
         """Implement rate limiting delay."""
         current_time = time.time()
         time_since_last = current_time - self.last_request_time
-        
-        # Determine rate limit based on model
-        if "large" in self.model:
-            min_interval = 60.0 / self.requests_per_minute_large
-        else:
-            min_interval = 60.0 / self.requests_per_minute
+        min_interval = self._min_request_interval()
         
         if time_since_last < min_interval:
             sleep_time = min_interval - time_since_last
@@ -85,6 +115,18 @@ class OpenAIEmbedder:
         
         self.last_request_time = time.time()
     
+    async def _arate_limit_delay(self):
+        """Implement rate limiting delay without blocking the event loop."""
+        current_time = time.time()
+        
+        # Reserve the next free slot before sleeping so concurrent callers
+        # are spaced out instead of all waking at the same time
+        scheduled_time = max(current_time, self.last_request_time + self._min_request_interval())
+        self.last_request_time = scheduled_time
+        
+        if scheduled_time > current_time:
+            await asyncio.sleep(scheduled_time - current_time)
+    
     def _exponential_backoff_retry(self, func, *args, **kwargs):
         """
         Retry function with exponential backoff.
@@ -119,41 +161,125 @@ class OpenAIEmbedder:
             texts: List of texts to embed
             
         Returns:
-            API response as dictionary
+            API response as dictionary, with each embedding decoded to a list of floats
         """
+        # base64 embeddings are raw little-endian float32 bytes, about half the size of float JSON
         payload = {
             "model": self.model,
             "input": texts,
-            "encoding_format": "float"
+            "encoding_format": "base64"
         }
         
-        response = requests.post(
-            self.base_url,
-            headers=self.headers,
-            json=payload,
-            timeout=30
-        )
+        # orjson encodes the payload and parses the response much faster than json
+        if orjson is not None:
+            response = self.session.post(self.base_url, data=orjson.dumps(payload), timeout=30)
+        else:
+            response = self.session.post(self.base_url, json=payload, timeout=30)
         
         if response.status_code != 200:
             error_msg = f"API request failed with status {response.status_code}: {response.text}"
             logger.error(error_msg)
             raise requests.exceptions.RequestException(error_msg)
         
-        return response.json()
+        if orjson is not None:
+            data = orjson.loads(response.content)
+        else:
+            data = response.json()
+        
+        for item in data['data']:
+            item['embedding'] = np.frombuffer(base64.b64decode(item['embedding']), dtype='<f4').tolist()
+        
+        return data
+    
+    def _get_encoding(self):
+        """
+        Get the tiktoken encoding for the model, loading it on first use.
+        
+        Returns:
+            tiktoken Encoding, or None if tiktoken is unavailable or can't load it
+        """
+        if self._encoding is None and tiktoken is not None:
+            try:
+                self._encoding = tiktoken.encoding_for_model(self.model)
+            except Exception as e:
+                logger.warning(f"Could not load tiktoken encoding for {self.model}, estimating tokens: {e}")
+                self._encoding = False
+        return self._encoding or None
     
     def _estimate_tokens(self, text: str) -> int:
         """
-        Estimate token count for a text (rough approximation).
+        Estimate token count for a text.
         
         Args:
             text: Text to estimate tokens for
             
         Returns:
-            Estimated token count
+            Exact token count if tiktoken is available, otherwise an estimate
         """
+        encoding = self._get_encoding()
+        if encoding is not None:
+            return len(encoding.encode_ordinary(text))
+        
         # Rough approximation: 1 token ≈ 4 characters for English text
         return len(text) // 4
     
+    def _count_tokens(self, texts: List[str]) -> List[int]:
+        """
+        Count tokens for several texts at once.
+        
+        Args:
+            texts: Texts to count tokens for
+            
+        Returns:
+            Token count (or estimate) for each text
+        """
+        encoding = self._get_encoding()
+        if encoding is not None:
+            return [len(tokens) for tokens in encoding.encode_ordinary_batch(texts)]
+        return [self._estimate_tokens(text) for text in texts]
+    
+    def _sort_by_length(self, texts: List[str]) -> Tuple[List[str], np.ndarray]:
+        """
+        Sort texts by length so each API request holds similarly sized texts.
+        
+        Args:
+            texts: List of texts to sort
+            
+        Returns:
+            Tuple of (sorted_texts, restore_order), where indexing the sorted
+            results with restore_order puts them back in the original order
+        """
+        order = np.argsort([len(text) for text in texts], kind='stable')
+        return [texts[i] for i in order], np.argsort(order)
+    
+    def _make_batches(self, texts: List[str], batch_size: int) -> List[List[str]]:
+        """
+        Split texts into request batches, limited by both text count and estimated tokens.
+        
+        Args:
+            texts: List of texts to split, in request order
+            batch_size: Maximum number of texts per batch
+            
+        Returns:
+            List of batches
+        """
+        batches = []
+        batch = []
+        batch_tokens = 0
+        
+        for text, tokens in zip(texts, self._count_tokens(texts)):
+            if batch and (len(batch) >= batch_size or batch_tokens + tokens > self.max_batch_tokens):
+                batches.append(batch)
+                batch = []
+                batch_tokens = 0
+            batch.append(text)
+            batch_tokens += tokens
+        
+        if batch:
+            batches.append(batch)
+        
+        return batches
+    
     def embed_text(self, text: str) -> List[float]:
         """
         Embed a single text string.
@@ -193,13 +319,18 @@ class OpenAIEmbedder:
             logger.error(f"Failed to embed text: {e}")
             raise
     
-    def embed_batch(self, texts: List[str], batch_size: int = 100) -> List[List[float]]:
+    def embed_batch(self, texts: List[str], batch_size: int = 100,
+                    max_concurrency: int = 10) -> List[List[float]]:
         """
         Embed a batch of texts efficiently.
         
+        When called outside a running event loop, the batches are sent through
+        aembed_batch so up to max_concurrency requests are in flight at once.
+        
         Args:
             texts: List of texts to embed
-            batch_size: Number of texts to process in each batch
+            batch_size: Maximum number of texts to process in each batch
+            max_concurrency: Maximum number of concurrent API requests
             
         Returns:
             List of embedding vectors
@@ -207,15 +338,21 @@ class OpenAIEmbedder:
         if not texts:
             return []
         
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            if max_concurrency > 1:
+                return asyncio.run(self.aembed_batch(texts, batch_size, max_concurrency))
+        
         logger.info(f"Starting batch embedding of {len(texts)} texts with batch size {batch_size}")
         
+        sorted_texts, restore_order = self._sort_by_length(texts)
+        
         all_embeddings = []
-        total_batches = (len(texts) + batch_size - 1) // batch_size
+        batches = self._make_batches(sorted_texts, batch_size)
+        total_batches = len(batches)
         
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-            batch_num = (i // batch_size) + 1
-            
+        for batch_num, batch in enumerate(batches, 1):
             logger.info(f"Processing batch {batch_num}/{total_batches} ({len(batch)} texts)")
             
             # Rate limiting
@@ -243,9 +380,70 @@ class OpenAIEmbedder:
                 # Add empty embeddings for failed batch
                 all_embeddings.extend([[] for _ in batch])
         
+        # Restore the caller's order
+        all_embeddings = [all_embeddings[i] for i in restore_order]
+        
         logger.info(f"Batch embedding completed: {len(all_embeddings)} embeddings generated")
         return all_embeddings
     
+    async def aembed_batch(self, texts: List[str], batch_size: int = 100,
+                           max_concurrency: int = 10) -> List[List[float]]:
+        """
+        Embed a batch of texts with several API requests in flight at once.
+        
+        Args:
+            texts: List of texts to embed
+            batch_size: Maximum number of texts to process in each batch
+            max_concurrency: Maximum number of concurrent API requests
+            
+        Returns:
+            List of embedding vectors, in the same order as texts
+        """
+        if not texts:
+            return []
+        
+        logger.info(f"Starting concurrent batch embedding of {len(texts)} texts with batch size {batch_size}")
+        
+        sorted_texts, restore_order = self._sort_by_length(texts)
+        
+        batches = self._make_batches(sorted_texts, batch_size)
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def embed_one_batch(batch_num: int, batch: List[str]) -> List[List[float]]:
+            async with semaphore:
+                await self._arate_limit_delay()
+                try:
+                    # The blocking request runs in a worker thread
+                    response = await asyncio.to_thread(
+                        self._exponential_backoff_retry, self._make_api_request, batch
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to embed batch {batch_num}: {e}")
+                    # Add empty embeddings for failed batch
+                    return [[] for _ in batch]
+            
+            # Update usage statistics
+            tokens = response['usage']['total_tokens']
+            self.total_tokens += tokens
+            cost = self._calculate_cost(tokens)
+            self.total_cost += cost
+            self.request_count += 1
+            
+            logger.info(f"Batch {batch_num}/{len(batches)} completed: {len(batch)} texts, ~{tokens} tokens, ${cost:.6f}")
+            return [item['embedding'] for item in response['data']]
+        
+        # gather returns results in submission order
+        results = await asyncio.gather(
+            *(embed_one_batch(batch_num, batch) for batch_num, batch in enumerate(batches, 1))
+        )
+        all_embeddings = [embedding for batch_embeddings in results for embedding in batch_embeddings]
+        
+        # Restore the caller's order
+        all_embeddings = [all_embeddings[i] for i in restore_order]
+        
+        logger.info(f"Concurrent batch embedding completed: {len(all_embeddings)} embeddings generated")
+        return all_embeddings
+    
     def get_usage_stats(self) -> Dict[str, Any]:
         """
         Get API usage statistics.
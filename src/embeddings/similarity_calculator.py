@@ -5,18 +5,78 @@ Similarity calculation utilities for embeddings.
 import numpy as np
 import logging
 from typing import List, Dict, Any, Optional, Tuple, Union
-from sklearn.metrics.pairwise import cosine_similarity, euclidean_distances
-from scipy.spatial.distance import cosine, euclidean
+from scipy.linalg.blas import sgemv
 import math
+from dataclasses import dataclass
+
+try:
+    import torch
+except ImportError:
+    torch = None
 
 logger = logging.getLogger(__name__)
 
+def _as_f32_2d(embeddings: Union[List[List[float]], np.ndarray]) -> np.ndarray:
+    """
+    Get embeddings as a contiguous [N, D] float32 array, without copying if they already are one.
+    
+    Args:
+        embeddings: Embedding vectors as a list of lists or an array
+        
+    Returns:
+        [N, D] float32 array
+    """
+    if (isinstance(embeddings, np.ndarray) and embeddings.dtype == np.float32
+            and embeddings.ndim == 2 and embeddings.flags.c_contiguous):
+        return embeddings
+    return np.ascontiguousarray(embeddings, dtype=np.float32).reshape(len(embeddings), -1)
+
+def _aligned_empty(shape: Tuple[int, ...], dtype: type = np.float32, alignment: int = 64) -> np.ndarray:
+    """
+    Allocate an uninitialized C-contiguous array whose data starts on an alignment boundary.
+    
+    Args:
+        shape: Array shape
+        dtype: Array dtype
+        alignment: Required byte alignment of the first element
+        
+    Returns:
+        Aligned array view into a slightly larger byte buffer
+    """
+    dtype = np.dtype(dtype)
+    nbytes = int(np.prod(shape)) * dtype.itemsize
+    buffer = np.empty(nbytes + alignment, dtype=np.uint8)
+    offset = -buffer.ctypes.data % alignment
+    return buffer[offset:offset + nbytes].view(dtype).reshape(shape)
+
+@dataclass
+class QuantizedEmbedding:
+    """An int8 symmetric-quantized embedding, approximately equal to code * scale."""
+    code: np.ndarray
+    scale: float
+
 class SimilarityCalculator:
     """Calculates various similarity metrics between embeddings."""
     
-    def __init__(self):
-        """Initialize similarity calculator."""
-        logger.info("Initialized similarity calculator")
+    # Elements in each tile's pairwise difference array when computing manhattan matrices
+    MANHATTAN_BLOCK_ELEMENTS = 1 << 16
+    # Rows per block when reducing norms for embedding statistics
+    STATISTICS_BLOCK_ROWS = 4096
+    # Smallest embedding matrix worth copying to the GPU for a Gram matrix
+    GPU_MIN_BYTES = 32 << 20
+    
+    def __init__(self, backend: str = 'numpy'):
+        """
+        Initialize similarity calculator.
+        
+        Args:
+            backend: 'numpy', or 'torch' to compute large similarity matrices on a CUDA GPU
+        """
+        if backend == 'torch' and (torch is None or not torch.cuda.is_available()):
+            logger.warning("PyTorch with CUDA is not available, using the numpy backend")
+            backend = 'numpy'
+        self.backend = backend
+        logger.info(f"Initialized similarity calculator ({backend} backend)")
     
     def cosine_similarity(self, embedding1: List[float], embedding2: List[float]) -> float:
         """
@@ -38,17 +98,16 @@ class SimilarityCalculator:
         
         try:
             # Convert to numpy arrays
-            vec1 = np.array(embedding1, dtype=np.float64)
-            vec2 = np.array(embedding2, dtype=np.float64)
+            vec1 = np.asarray(embedding1, dtype=np.float32)
+            vec2 = np.asarray(embedding2, dtype=np.float32)
             
-            # Calculate cosine similarity
-            similarity = 1 - cosine(vec1, vec2)
-            
-            # Handle NaN values
-            if np.isnan(similarity):
+            # Cosine is the dot product scaled by both norms; zero or NaN norms score 0
+            norm_product = np.sqrt(np.dot(vec1, vec1) * np.dot(vec2, vec2))
+            if not norm_product > 0:
                 return 0.0
             
-            return float(similarity)
+            # NaN inputs already failed the norm check above
+            return float(np.dot(vec1, vec2) / norm_product)
             
         except Exception as e:
             logger.error(f"Error calculating cosine similarity: {e}")
@@ -73,18 +132,15 @@ class SimilarityCalculator:
             return float('inf')
         
         try:
-            # Convert to numpy arrays
-            vec1 = np.array(embedding1, dtype=np.float64)
-            vec2 = np.array(embedding2, dtype=np.float64)
-            
-            # Calculate Euclidean distance
-            distance = euclidean(vec1, vec2)
+            # One float32 difference vector; its norm is the distance
+            difference = np.subtract(embedding1, embedding2, dtype=np.float32)
+            distance = math.sqrt(float(np.dot(difference, difference)))
             
             # Handle NaN values
-            if np.isnan(distance):
+            if math.isnan(distance):
                 return float('inf')
             
-            return float(distance)
+            return distance
             
         except Exception as e:
             logger.error(f"Error calculating Euclidean distance: {e}")
@@ -101,14 +157,26 @@ class SimilarityCalculator:
         Returns:
             Euclidean similarity score (0 to 1, where 1 is most similar)
         """
-        distance = self.euclidean_distance(embedding1, embedding2)
+        if not embedding1 or not embedding2:
+            return 0.0
+        
+        if len(embedding1) != len(embedding2):
+            logger.warning("Embedding dimensions don't match")
+            return 0.0
+        
+        try:
+            # One float32 difference vector; its norm is the distance
+            difference = np.subtract(embedding1, embedding2, dtype=np.float32)
+            distance = math.sqrt(float(np.dot(difference, difference)))
+        except Exception as e:
+            logger.error(f"Error calculating Euclidean similarity: {e}")
+            return 0.0
         
-        if distance == float('inf'):
+        if math.isnan(distance):
             return 0.0
         
         # Convert distance to similarity (1 / (1 + distance))
-        similarity = 1 / (1 + distance)
-        return similarity
+        return 1 / (1 + distance)
     
     def dot_product_similarity(self, embedding1: List[float], embedding2: List[float]) -> float:
         """
@@ -130,17 +198,17 @@ class SimilarityCalculator:
         
         try:
             # Convert to numpy arrays
-            vec1 = np.array(embedding1, dtype=np.float64)
-            vec2 = np.array(embedding2, dtype=np.float64)
+            vec1 = np.asarray(embedding1, dtype=np.float32)
+            vec2 = np.asarray(embedding2, dtype=np.float32)
             
             # Calculate dot product
-            dot_product = np.dot(vec1, vec2)
+            dot_product = float(np.dot(vec1, vec2))
             
             # Handle NaN values
-            if np.isnan(dot_product):
+            if math.isnan(dot_product):
                 return 0.0
             
-            return float(dot_product)
+            return dot_product
             
         except Exception as e:
             logger.error(f"Error calculating dot product similarity: {e}")
@@ -166,17 +234,17 @@ class SimilarityCalculator:
         
         try:
             # Convert to numpy arrays
-            vec1 = np.array(embedding1, dtype=np.float64)
-            vec2 = np.array(embedding2, dtype=np.float64)
+            vec1 = np.asarray(embedding1, dtype=np.float32)
+            vec2 = np.asarray(embedding2, dtype=np.float32)
             
             # Calculate Manhattan distance
-            distance = np.sum(np.abs(vec1 - vec2))
+            distance = float(np.sum(np.abs(vec1 - vec2)))
             
             # Handle NaN values
-            if np.isnan(distance):
+            if math.isnan(distance):
                 return float('inf')
             
-            return float(distance)
+            return distance
             
         except Exception as e:
             logger.error(f"Error calculating Manhattan distance: {e}")
@@ -202,8 +270,8 @@ class SimilarityCalculator:
             'manhattan_distance': self.manhattan_distance(embedding1, embedding2)
         }
     
-    def find_most_similar(self, query_embedding: List[float], 
-                         candidate_embeddings: List[List[float]], 
+    def find_most_similar(self, query_embedding: Union[List[float], np.ndarray], 
+                         candidate_embeddings: Union[List[List[float]], np.ndarray], 
                          metric: str = 'cosine_similarity',
                          top_k: int = 5) -> List[Tuple[int, float]]:
         """
@@ -211,102 +279,410 @@ class SimilarityCalculator:
         
         Args:
             query_embedding: Query embedding vector
-            candidate_embeddings: List of candidate embedding vectors
+            candidate_embeddings: List of candidate embedding vectors, or an [N, D] array
             metric: Similarity metric to use
             top_k: Number of top results to return
             
         Returns:
             List of (index, similarity_score) tuples, sorted by similarity
         """
-        if not query_embedding or not candidate_embeddings:
-            return []
-        
-        similarities = []
+        indices, scores = self.find_most_similar_np(query_embedding, candidate_embeddings, metric, top_k)
+        return list(zip(indices.tolist(), scores.tolist()))
+    
+    def find_most_similar_np(self, query_embedding: Union[List[float], np.ndarray],
+                             candidate_embeddings: Union[List[List[float]], np.ndarray],
+                             metric: str = 'cosine_similarity',
+                             top_k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the most similar embeddings to a query embedding, returning arrays.
         
-        for i, candidate in enumerate(candidate_embeddings):
-            if not candidate:
-                continue
+        Args:
+            query_embedding: Query embedding vector
+            candidate_embeddings: List of candidate embedding vectors, or an [N, D] array
+            metric: Similarity metric to use
+            top_k: Number of top results to return
             
-            if metric == 'cosine_similarity':
-                score = self.cosine_similarity(query_embedding, candidate)
-            elif metric == 'euclidean_similarity':
-                score = self.euclidean_similarity(query_embedding, candidate)
-            elif metric == 'dot_product':
-                score = self.dot_product_similarity(query_embedding, candidate)
-            elif metric == 'euclidean_distance':
-                # For distance metrics, we want to minimize
-                score = -self.euclidean_distance(query_embedding, candidate)
-            elif metric == 'manhattan_distance':
-                # For distance metrics, we want to minimize
-                score = -self.manhattan_distance(query_embedding, candidate)
+        Returns:
+            Tuple of (int64 candidate indices, float32 similarity scores), sorted by similarity
+        """
+        if len(query_embedding) == 0 or len(candidate_embeddings) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        
+        # Pick the batch kernel once; distance metrics are negated so higher is better
+        kernels = {
+            'cosine_similarity': self.cosine_similarity_batch,
+            'euclidean_similarity': self._euclidean_similarity_batch,
+            'dot_product': self._dot_product_batch,
+            'euclidean_distance': self._negative_euclidean_batch,
+            'manhattan_distance': self._negative_manhattan_batch
+        }
+        if metric not in kernels:
+            logger.warning(f"Unknown metric: {metric}, using cosine similarity")
+            metric = 'cosine_similarity'
+        kernel = kernels[metric]
+        
+        # Empty candidates are skipped; ones whose dimension doesn't match get the
+        # same score the single-pair methods give them
+        if isinstance(candidate_embeddings, np.ndarray) and candidate_embeddings.ndim == 2:
+            valid_indices = np.arange(candidate_embeddings.shape[0])
+            matching = np.full(len(valid_indices), candidate_embeddings.shape[1] == len(query_embedding))
+        else:
+            valid_indices = np.array([i for i, candidate in enumerate(candidate_embeddings) if len(candidate)],
+                                     dtype=np.int64)
+            matching = np.array([len(candidate_embeddings[i]) == len(query_embedding) for i in valid_indices],
+                                dtype=bool)
+        
+        if not matching.all():
+            logger.warning("Embedding dimensions don't match")
+        
+        mismatch_score = -np.inf if metric in ('euclidean_distance', 'manhattan_distance') else 0.0
+        scores = np.full(len(valid_indices), mismatch_score, dtype=np.float32)
+        if matching.any():
+            if isinstance(candidate_embeddings, np.ndarray) and matching.all():
+                matrix = _as_f32_2d(candidate_embeddings)
             else:
-                logger.warning(f"Unknown metric: {metric}, using cosine similarity")
-                score = self.cosine_similarity(query_embedding, candidate)
+                matrix = _as_f32_2d([candidate_embeddings[i] for i in valid_indices[matching]])
+            scores[matching] = kernel(np.asarray(query_embedding, dtype=np.float32), matrix)
+        
+        top = self._top_k_indices(scores, top_k)
+        return valid_indices[top], scores[top]
+    
+    def _dot_product_batch(self, query: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+        """Dot product of a query with every candidate row."""
+        return self.matrix_dot_scores(candidates, query)
+    
+    def _negative_euclidean_batch(self, query: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+        """Negated Euclidean distance from a query to every candidate row."""
+        return -np.linalg.norm(candidates - query, axis=1)
+    
+    def _euclidean_similarity_batch(self, query: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+        """Euclidean similarity, 1 / (1 + distance), of a query to every candidate row."""
+        return 1 / (1 - self._negative_euclidean_batch(query, candidates))
+    
+    def _negative_manhattan_batch(self, query: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+        """Negated Manhattan distance from a query to every candidate row."""
+        return -np.abs(candidates - query).sum(axis=1)
+    
+    def cosine_similarity_batch(self, query: Union[List[float], np.ndarray],
+                                candidates: Union[List[List[float]], np.ndarray]) -> np.ndarray:
+        """
+        Calculate cosine similarity between a query and every candidate at once.
+        
+        Args:
+            query: Query embedding vector
+            candidates: Candidate embeddings as an [N, D] array or list of vectors
             
-            similarities.append((i, score))
+        Returns:
+            Array of N float32 cosine similarities (0 for zero-norm vectors)
+        """
+        candidates = _as_f32_2d(candidates)
+        query = np.asarray(query, dtype=np.float32)
+        query_norm = np.linalg.norm(query)
+        if not query_norm > 0:
+            return np.zeros(candidates.shape[0], dtype=np.float32)
+        
+        norms = np.linalg.norm(candidates, axis=1)
+        scores = self.matrix_dot_scores(candidates, query / query_norm)
+        return np.divide(scores, norms, out=np.zeros_like(scores), where=norms > 0)
+    
+    def prepare_corpus(self, candidates: Union[List[List[float]], np.ndarray]) -> np.ndarray:
+        """
+        Pack candidate embeddings into one 64-byte aligned, C-contiguous float32 matrix.
         
-        # Sort by similarity score (descending)
-        similarities.sort(key=lambda x: x[1], reverse=True)
+        Convert a candidate list once with this and pass the matrix to find_most_similar,
+        cosine_similarity_batch or batch_similarity_matrix on every query; they use it
+        without copying, and each row scan is a linear, SIMD-aligned read.
+        
+        Args:
+            candidates: Candidate embeddings as an [N, D] array or list of equal-length vectors
+            
+        Returns:
+            [N, D] float32 matrix (the input itself if it already qualifies)
+        """
+        matrix = _as_f32_2d(candidates)
+        if matrix.ctypes.data % 64 == 0:
+            return matrix
         
-        # Return top_k results
-        return similarities[:top_k]
+        corpus = _aligned_empty(matrix.shape)
+        corpus[...] = matrix
+        return corpus
+    
+    def matrix_dot_scores(self, matrix: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """
+        Calculate the dot product of every row of a matrix with a query vector.
+        
+        Float32 inputs go straight to single-precision BLAS (sgemv), so neither the
+        matrix nor the query is upcast or copied.
+        
+        Args:
+            matrix: Candidate embeddings as an [N, D] array
+            query: Query embedding as a [D] array
+            
+        Returns:
+            Array of N dot-product scores
+        """
+        if matrix.dtype == np.float32 and matrix.flags.c_contiguous:
+            # matrix.T is Fortran-ordered, so sgemv with trans=1 computes matrix @ query in place
+            return sgemv(1.0, matrix.T, np.asarray(query, dtype=np.float32), trans=1)
+        
+        return np.asarray(matrix) @ np.asarray(query, dtype=matrix.dtype)
+    
+    def quantize(self, embedding: Union[List[float], np.ndarray]) -> QuantizedEmbedding:
+        """
+        Quantize an embedding to int8 codes with one scale.
+        
+        The scale is max|v| / 127, so codes stay in [-127, 127] and the range is
+        symmetric around zero.
+        
+        Args:
+            embedding: Embedding vector
+            
+        Returns:
+            QuantizedEmbedding with int8 codes and a float32 scale
+        """
+        codes, scales = self.quantize_matrix(np.asarray(embedding, dtype=np.float32).reshape(1, -1))
+        return QuantizedEmbedding(code=codes[0], scale=float(scales[0]))
+    
+    def quantize_matrix(self, matrix: Union[List[List[float]], np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Quantize every row of a matrix to int8 codes with one scale per row.
+        
+        Args:
+            matrix: Embeddings as an [N, D] array or list of vectors
+            
+        Returns:
+            Tuple of ([N, D] int8 codes, [N] float32 scales); all-zero rows get scale 0
+        """
+        matrix = _as_f32_2d(matrix)
+        scales = np.abs(matrix).max(axis=1, initial=0.0) / np.float32(127)
+        safe_scales = np.where(scales > 0, scales, np.float32(1))
+        codes = np.rint(matrix / safe_scales[:, None]).astype(np.int8)
+        return codes, scales.astype(np.float32)
+    
+    def dot_quant(self, query: Union[List[float], np.ndarray], quantized: QuantizedEmbedding) -> float:
+        """
+        Calculate the approximate dot product of a float query with a quantized embedding.
+        
+        Args:
+            query: Query embedding vector
+            quantized: Quantized candidate embedding
+            
+        Returns:
+            Approximate dot product
+        """
+        query = np.asarray(query, dtype=np.float32)
+        return float(np.dot(query, quantized.code.astype(np.float32)) * quantized.scale)
+    
+    def quantized_dot_scores(self, quantized_matrix: np.ndarray, scales: np.ndarray,
+                             query: np.ndarray) -> np.ndarray:
+        """
+        Calculate approximate dot products against an int8-quantized matrix.
+        
+        The query is quantized the same way as the matrix rows, the int8 products are
+        accumulated in int32 and the result is rescaled by both scales.
+        
+        Args:
+            quantized_matrix: Candidate embeddings as an [N, D] int8 array
+            scales: Per-row scales of the quantized matrix
+            query: Query embedding as a [D] array
+            
+        Returns:
+            Array of N approximate dot-product scores
+        """
+        query = np.asarray(query, dtype=np.float32)
+        query_scale = np.abs(query).max(initial=0.0) / 127
+        if query_scale == 0:
+            return np.zeros(quantized_matrix.shape[0], dtype=np.float32)
+        
+        quantized_query = np.rint(query / query_scale).astype(np.int32)
+        scores = np.einsum('ij,j->i', quantized_matrix, quantized_query)
+        return scores * (scales * np.float32(query_scale))
+    
+    def quantized_manhattan_matrix(self, matrix: Union[List[List[float]], np.ndarray]) -> np.ndarray:
+        """
+        Calculate approximate pairwise Manhattan distances on int8-quantized rows.
+        
+        Manhattan distance only survives quantization when every row shares one scale,
+        so the whole matrix is quantized with max|X| / 127. Absolute code differences are
+        summed in int32 and rescaled once.
+        
+        Args:
+            matrix: Embeddings as an [N, D] array or list of vectors
+            
+        Returns:
+            [N, N] float32 matrix of approximate Manhattan distances
+        """
+        matrix = _as_f32_2d(matrix)
+        scale = np.abs(matrix).max(initial=0.0) / np.float32(127)
+        n = matrix.shape[0]
+        if scale == 0:
+            return np.zeros((n, n), dtype=np.float32)
+        
+        # int16 codes so differences of two int8 values cannot overflow
+        codes = np.rint(matrix / scale).astype(np.int16)
+        distances = self._manhattan_matrix(codes, np.int32)
+        distances *= scale
+        return distances
+    
+    def _manhattan_matrix(self, matrix: np.ndarray, sum_dtype: type = np.float32) -> np.ndarray:
+        """
+        Calculate pairwise Manhattan distances tile by tile.
+        
+        Each tile's [tile, tile, D] difference array stays around MANHATTAN_BLOCK_ELEMENTS,
+        small enough to live in L2, and only tiles on or above the diagonal are computed
+        since the result is symmetric.
+        
+        Args:
+            matrix: [N, D] matrix of float32 embeddings or int16 codes
+            sum_dtype: Accumulator dtype for each distance
+            
+        Returns:
+            [N, N] float32 distance matrix
+        """
+        n = matrix.shape[0]
+        distances = np.empty((n, n), dtype=np.float32)
+        tile = max(1, math.isqrt(self.MANHATTAN_BLOCK_ELEMENTS // max(1, matrix.shape[1])))
+        for i in range(0, n, tile):
+            rows = matrix[i:i + tile, None, :]
+            for j in range(i, n, tile):
+                block = np.abs(rows - matrix[None, j:j + tile, :]).sum(axis=-1, dtype=sum_dtype)
+                distances[i:i + tile, j:j + tile] = block
+                distances[j:j + tile, i:i + tile] = block.T
+        return distances
+    
+    def top_k_scores(self, scores: np.ndarray, top_k: int) -> List[Tuple[int, float]]:
+        """
+        Select the highest scores without fully sorting them.
+        
+        Args:
+            scores: Array of similarity scores
+            top_k: Number of top results to return
+            
+        Returns:
+            List of (index, similarity_score) tuples, sorted by similarity
+        """
+        top = self._top_k_indices(scores, top_k)
+        return list(zip(top.tolist(), scores[top].tolist()))
+    
+    def _top_k_indices(self, scores: np.ndarray, top_k: int) -> np.ndarray:
+        """
+        Get the indices of the highest scores, sorted by score.
+        
+        Args:
+            scores: Array of similarity scores
+            top_k: Number of top results to return
+            
+        Returns:
+            Array of up to top_k indices
+        """
+        top_k = min(top_k, len(scores))
+        if top_k <= 0:
+            return np.empty(0, dtype=np.int64)
+        
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        return top[np.argsort(-scores[top], kind='stable')]
+    
+    def top_k_similarity_matrix(self, matrix: np.ndarray, top_k: int,
+                                tile_size: int = 1024) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the top_k most similar rows for every row of a matrix of unit vectors.
+        
+        The similarity matrix is computed one tile of rows at a time and reduced to
+        its top_k entries immediately, so the full N x N matrix is never held in memory.
+        
+        Args:
+            matrix: [N, D] matrix of L2-normalized embeddings
+            top_k: Number of most similar rows to keep per row
+            tile_size: Number of rows to score per block
+            
+        Returns:
+            Tuple of ([N, k] int32 indices, [N, k] float32 cosine similarities),
+            each row sorted by similarity
+        """
+        n = matrix.shape[0]
+        top_k = min(top_k, n)
+        top_indices = np.empty((n, top_k), dtype=np.int32)
+        top_values = np.empty((n, top_k), dtype=np.float32)
+        if top_k <= 0:
+            return top_indices, top_values
+        
+        for start in range(0, n, tile_size):
+            block = matrix[start:start + tile_size] @ matrix.T
+            
+            block_top = np.argpartition(-block, top_k - 1, axis=1)[:, :top_k]
+            block_values = np.take_along_axis(block, block_top, axis=1)
+            order = np.argsort(-block_values, axis=1, kind='stable')
+            
+            top_indices[start:start + tile_size] = np.take_along_axis(block_top, order, axis=1)
+            top_values[start:start + tile_size] = np.take_along_axis(block_values, order, axis=1)
+        
+        return top_indices, top_values
     
     def batch_similarity_matrix(self, embeddings: List[List[float]], 
-                              metric: str = 'cosine_similarity') -> np.ndarray:
+                              metric: str = 'cosine_similarity',
+                              unit_norm: bool = False, quantized: bool = False) -> np.ndarray:
         """
         Calculate similarity matrix for a batch of embeddings.
         
         Args:
-            embeddings: List of embedding vectors
+            embeddings: List of embedding vectors, or an [N, D] array
             metric: Similarity metric to use
+            unit_norm: Embeddings are already unit length (e.g. from normalize_embeddings_np),
+                so euclidean distances come straight from the Gram matrix
+            quantized: Compute manhattan distances on int8 codes (see quantized_manhattan_matrix)
             
         Returns:
             Similarity matrix as numpy array
         """
-        if not embeddings:
+        if len(embeddings) == 0:
             return np.array([])
         
         # Filter out empty embeddings
-        valid_embeddings = [emb for emb in embeddings if emb]
+        if isinstance(embeddings, np.ndarray):
+            valid_embeddings = embeddings
+        else:
+            valid_embeddings = [emb for emb in embeddings if len(emb)]
         
-        if not valid_embeddings:
+        if len(valid_embeddings) == 0:
             return np.array([])
         
         try:
-            # Convert to numpy array
-            embedding_matrix = np.array(valid_embeddings, dtype=np.float64)
+            # One contiguous float32 matrix, shared by every metric
+            embedding_matrix = _as_f32_2d(valid_embeddings)
             
-            if metric == 'cosine_similarity':
-                # Use sklearn's cosine_similarity for efficiency
-                similarity_matrix = cosine_similarity(embedding_matrix)
+            if metric == 'dot_product':
+                similarity_matrix = self._gram_matrix(embedding_matrix)
+                np.fill_diagonal(similarity_matrix, 1.0)
             elif metric == 'euclidean_distance':
-                # Use sklearn's euclidean_distances for efficiency
-                distance_matrix = euclidean_distances(embedding_matrix)
+                # ||a - b||^2 = ||a||^2 + ||b||^2 - 2 a.b, with the cross terms from one GEMM
+                distance_matrix = self._gram_matrix(embedding_matrix)
+                distance_matrix *= -2
+                if unit_norm:
+                    # Both squared norms are 1
+                    distance_matrix += 2
+                else:
+                    squared_norms = np.einsum('ij,ij->i', embedding_matrix, embedding_matrix)
+                    distance_matrix += squared_norms[:, None]
+                    distance_matrix += squared_norms[None, :]
+                # Cancellation leaves small float32 errors; clamp them and zero the exact self-distances
+                np.maximum(distance_matrix, 0, out=distance_matrix)
+                np.fill_diagonal(distance_matrix, 0)
+                np.sqrt(distance_matrix, out=distance_matrix)
                 # Convert distances to similarities
-                similarity_matrix = 1 / (1 + distance_matrix)
+                distance_matrix += 1
+                similarity_matrix = np.reciprocal(distance_matrix, out=distance_matrix)
+            elif metric == 'manhattan_distance' and quantized:
+                distance_matrix = self.quantized_manhattan_matrix(embedding_matrix)
+                distance_matrix += 1
+                similarity_matrix = np.reciprocal(distance_matrix, out=distance_matrix)
+            elif metric == 'manhattan_distance':
+                distance_matrix = self._manhattan_matrix(embedding_matrix)
+                distance_matrix += 1
+                similarity_matrix = np.reciprocal(distance_matrix, out=distance_matrix)
             else:
-                # For other metrics, calculate pairwise
-                n = len(valid_embeddings)
-                similarity_matrix = np.zeros((n, n))
-                
-                for i in range(n):
-                    for j in range(n):
-                        if i == j:
-                            similarity_matrix[i, j] = 1.0
-                        else:
-                            if metric == 'dot_product':
-                                similarity_matrix[i, j] = self.dot_product_similarity(
-                                    valid_embeddings[i], valid_embeddings[j]
-                                )
-                            elif metric == 'manhattan_distance':
-                                distance = self.manhattan_distance(
-                                    valid_embeddings[i], valid_embeddings[j]
-                                )
-                                similarity_matrix[i, j] = 1 / (1 + distance)
-                            else:
-                                similarity_matrix[i, j] = self.cosine_similarity(
-                                    valid_embeddings[i], valid_embeddings[j]
-                                )
+                # Cosine similarity is the Gram matrix of the row-normalized embeddings
+                unit_matrix = embedding_matrix if unit_norm else self._normalize_rows(embedding_matrix)[0]
+                similarity_matrix = self._gram_matrix(unit_matrix)
             
             return similarity_matrix
             
@@ -314,25 +690,83 @@ class SimilarityCalculator:
             logger.error(f"Error calculating batch similarity matrix: {e}")
             return np.array([])
     
-    def normalize_embeddings(self, embeddings: List[List[float]]) -> List[List[float]]:
+    def _gram_matrix(self, matrix: np.ndarray) -> np.ndarray:
+        """
+        Calculate matrix @ matrix.T, on the GPU when the torch backend is active and the matrix is large.
+        
+        Args:
+            matrix: [N, D] float32 matrix
+            
+        Returns:
+            [N, N] float32 matrix of row dot products
+        """
+        if self.backend != 'torch' or matrix.nbytes < self.GPU_MIN_BYTES:
+            return matrix @ matrix.T
+        
+        # Pinned host memory lets the upload run asynchronously
+        device_matrix = torch.from_numpy(matrix).pin_memory().to('cuda', non_blocking=True)
+        return (device_matrix @ device_matrix.T).cpu().numpy()
+    
+    def _normalize_rows(self, matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Scale every row of a float32 matrix to unit length.
+        
+        Args:
+            matrix: [N, D] float32 matrix
+            
+        Returns:
+            Tuple of (new [N, D] matrix with zero-norm rows left as zeros, [N] mask of nonzero rows)
+        """
+        norms = np.einsum('ij,ij->i', matrix, matrix)
+        np.sqrt(norms, out=norms)
+        nonzero = norms > 0
+        unit_matrix = np.zeros_like(matrix)
+        np.divide(matrix, norms[:, None], out=unit_matrix, where=nonzero[:, None])
+        return unit_matrix, nonzero
+    
+    def normalize_embeddings_np(self, embeddings: Union[List[List[float]], np.ndarray]) -> np.ndarray:
+        """
+        Normalize equal-length embeddings to unit vectors, keeping them as one array.
+        
+        Args:
+            embeddings: Embeddings as an [N, D] array or list of vectors
+            
+        Returns:
+            [N, D] float32 array of unit rows; zero-norm rows stay zero
+        """
+        return self._normalize_rows(_as_f32_2d(embeddings))[0]
+    
+    def normalize_embeddings(self, embeddings: List[List[float]],
+                             return_numpy: bool = False) -> Union[List[List[float]], np.ndarray]:
         """
         Normalize embeddings to unit vectors.
         
         Args:
             embeddings: List of embedding vectors
+            return_numpy: Return an [N, D] float32 array (see normalize_embeddings_np)
+                instead of lists. Requires equal-length embeddings.
             
         Returns:
             List of normalized embedding vectors
         """
+        if return_numpy:
+            return self.normalize_embeddings_np(embeddings)
+        
+        # Equal-length embeddings are normalized as one matrix; ragged ones row by row
+        lengths = {len(embedding) for embedding in embeddings}
+        if len(lengths) == 1 and 0 not in lengths:
+            unit_matrix, nonzero = self._normalize_rows(_as_f32_2d(embeddings))
+            return [row if keep else [] for row, keep in zip(unit_matrix.tolist(), nonzero)]
+        
         normalized = []
         
         for embedding in embeddings:
-            if not embedding:
+            if not len(embedding):
                 normalized.append([])
                 continue
             
             try:
-                vec = np.array(embedding, dtype=np.float64)
+                vec = np.asarray(embedding, dtype=np.float32)
                 norm = np.linalg.norm(vec)
                 
                 if norm > 0:
@@ -347,17 +781,19 @@ class SimilarityCalculator:
         
         return normalized
     
-    def calculate_embedding_statistics(self, embeddings: List[List[float]]) -> Dict[str, Any]:
+    def calculate_embedding_statistics(self, embeddings: List[List[float]],
+                                       return_numpy: bool = False) -> Dict[str, Any]:
         """
         Calculate statistics for a set of embeddings.
         
         Args:
-            embeddings: List of embedding vectors
+            embeddings: List of embedding vectors, or an [N, D] array
+            return_numpy: Also include the float32 'norms' array of the valid embeddings
             
         Returns:
             Dictionary with embedding statistics
         """
-        if not embeddings:
+        if len(embeddings) == 0:
             return {
                 'count': 0,
                 'dimensions': 0,
@@ -368,9 +804,12 @@ class SimilarityCalculator:
             }
         
         # Filter out empty embeddings
-        valid_embeddings = [emb for emb in embeddings if emb]
+        if isinstance(embeddings, np.ndarray):
+            valid_embeddings = embeddings
+        else:
+            valid_embeddings = [emb for emb in embeddings if len(emb)]
         
-        if not valid_embeddings:
+        if len(valid_embeddings) == 0:
             return {
                 'count': len(embeddings),
                 'valid_count': 0,
@@ -383,10 +822,14 @@ class SimilarityCalculator:
         
         try:
             # Convert to numpy array
-            embedding_matrix = np.array(valid_embeddings, dtype=np.float64)
+            embedding_matrix = _as_f32_2d(valid_embeddings)
             
-            # Calculate norms
-            norms = np.linalg.norm(embedding_matrix, axis=1)
+            # Squared row norms in one pass per block of rows, then square-rooted in place
+            norms = np.empty(embedding_matrix.shape[0], dtype=np.float32)
+            for start in range(0, embedding_matrix.shape[0], self.STATISTICS_BLOCK_ROWS):
+                block = embedding_matrix[start:start + self.STATISTICS_BLOCK_ROWS]
+                np.einsum('ij,ij->i', block, block, out=norms[start:start + self.STATISTICS_BLOCK_ROWS])
+            np.sqrt(norms, out=norms)
             
             stats = {
                 'count': len(embeddings),
@@ -397,6 +840,8 @@ class SimilarityCalculator:
                 'min_norm': float(np.min(norms)),
                 'max_norm': float(np.max(norms))
             }
+            if return_numpy:
+                stats['norms'] = norms
             
             return stats
             
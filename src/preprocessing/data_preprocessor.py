@@ -5,17 +5,66 @@ Data preprocessing pipeline for job posting data.
 import pandas as pd
 import json
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat, chain
+from functools import lru_cache
+from collections import Counter
 import os
 
 from .text_cleaner import TextCleaner
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 logger = logging.getLogger(__name__)
 
+# Preprocessor owned by each worker process, created on its first chunk
+_worker_preprocessor = None
+
+def _preprocess_chunk(jobs: List[Dict[str, Any]], config: Dict[str, bool],
+                      preprocessed_at: str) -> List[Dict[str, Any]]:
+    """
+    Preprocess a contiguous chunk of jobs in a worker process.
+    
+    Args:
+        jobs: Raw job data dictionaries
+        config: Dictionary with 'remove_stop_words', 'lemmatize' and 'extract_skills' flags
+        preprocessed_at: Timestamp recorded on every job of the batch
+        
+    Returns:
+        List of the valid preprocessed jobs, in order
+    """
+    global _worker_preprocessor
+    if _worker_preprocessor is None:
+        _worker_preprocessor = DataPreprocessor()
+    
+    results = [_worker_preprocessor.preprocess_one(job, config, preprocessed_at) for job in jobs]
+    return [job for job in results if job]
+
 class DataPreprocessor:
     """Handles comprehensive preprocessing of job posting data."""
     
+    # Below this many jobs, worker startup costs more than it saves
+    PARALLEL_MIN_JOBS = 2000
+    
+    # Contiguous chunks per worker; a few per worker keeps the load balanced
+    PARALLEL_CHUNKS_PER_WORKER = 4
+    
+    # Distinct strings remembered per cleaning step; feeds repeat titles and boilerplate descriptions
+    TEXT_CACHE_SIZE = 20000
+    
+    # Shortest cleaned description a preprocessed job may have
+    MIN_DESCRIPTION_LENGTH = 20
+    
     def __init__(self):
         self.text_cleaner = TextCleaner()
         self.required_fields = [
@@ -25,50 +74,104 @@ class DataPreprocessor:
             'required_skills', 'experience_level', 'salary_range', 
             'posted_date', 'job_url', 'source_website'
         ]
+        self._init_text_caches()
+    
+    def _init_text_caches(self):
+        """Wrap the TextCleaner steps used per job in LRU caches keyed on their arguments."""
+        cleaner = self.text_cleaner
+        self._normalize_job_title = lru_cache(maxsize=self.TEXT_CACHE_SIZE)(cleaner.normalize_job_title)
+        self._normalize_location = lru_cache(maxsize=self.TEXT_CACHE_SIZE)(cleaner.normalize_location)
+        self._clean_and_prepare = lru_cache(maxsize=self.TEXT_CACHE_SIZE)(cleaner.clean_and_prepare)
+        # Cached as tuples so callers can't mutate a shared result
+        self._extract_skills = lru_cache(maxsize=self.TEXT_CACHE_SIZE)(
+            lambda text: tuple(cleaner.extract_skills(text))
+        )
     
     def preprocess_job_data(self, jobs_data: List[Dict[str, Any]], 
                           remove_stop_words: bool = False,
                           lemmatize: bool = False,
-                          extract_skills: bool = True) -> List[Dict[str, Any]]:
+                          extract_skills: bool = True,
+                          n_workers: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Preprocess job data with comprehensive cleaning and normalization.
         
+        Large job lists are split into contiguous chunks that worker processes
+        preprocess with their own DataPreprocessor; small ones are processed
+        in-process.
+        
         Args:
             jobs_data: List of raw job data dictionaries
             remove_stop_words: Whether to remove stop words from descriptions
             lemmatize: Whether to apply lemmatization
             extract_skills: Whether to extract skills from descriptions
+            n_workers: Number of worker processes (default: CPU count, 1 disables)
             
         Returns:
             List of preprocessed job data dictionaries
         """
-        preprocessed_jobs = []
-        
         logger.info(f"Starting preprocessing of {len(jobs_data)} jobs")
         
-        for i, job in enumerate(jobs_data):
-            try:
-                preprocessed_job = self._preprocess_single_job(
-                    job, remove_stop_words, lemmatize, extract_skills
-                )
-                
-                if preprocessed_job:
-                    preprocessed_jobs.append(preprocessed_job)
-                
-                if (i + 1) % 10 == 0:
-                    logger.info(f"Preprocessed {i + 1}/{len(jobs_data)} jobs")
-                    
-            except Exception as e:
-                logger.error(f"Error preprocessing job {i}: {e}")
-                continue
+        # One timestamp and config dict, shared by every job in the batch
+        preprocessed_at = datetime.now().isoformat()
+        config = {
+            'remove_stop_words': remove_stop_words,
+            'lemmatize': lemmatize,
+            'extract_skills': extract_skills
+        }
+        
+        n_workers = n_workers or os.cpu_count() or 1
+        if n_workers > 1 and len(jobs_data) >= self.PARALLEL_MIN_JOBS:
+            n_chunks = n_workers * self.PARALLEL_CHUNKS_PER_WORKER
+            chunk_size = -(-len(jobs_data) // n_chunks)
+            chunks = [jobs_data[i:i + chunk_size] for i in range(0, len(jobs_data), chunk_size)]
+            
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                results = executor.map(_preprocess_chunk, chunks, repeat(config), repeat(preprocessed_at))
+                preprocessed_jobs = list(chain.from_iterable(results))
+            
+            logger.info(f"Successfully preprocessed {len(preprocessed_jobs)} jobs using {n_workers} workers")
+            return preprocessed_jobs
+        
+        # _preprocess_single_job logs and returns None for jobs it can't preprocess
+        results = [
+            self._preprocess_single_job(
+                job, remove_stop_words, lemmatize, extract_skills, preprocessed_at, config
+            )
+            for job in jobs_data
+        ]
+        preprocessed_jobs = [job for job in results if job]
         
         logger.info(f"Successfully preprocessed {len(preprocessed_jobs)} jobs")
         return preprocessed_jobs
     
+    def preprocess_one(self, job: Dict[str, Any], 
+                       config: Dict[str, bool],
+                       preprocessed_at: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Preprocess a single job entry using a preprocessing config.
+        
+        Args:
+            job: Raw job data dictionary
+            config: Dictionary with 'remove_stop_words', 'lemmatize' and 'extract_skills' flags
+            preprocessed_at: Timestamp to record (default: now)
+            
+        Returns:
+            Preprocessed job data dictionary or None if invalid
+        """
+        return self._preprocess_single_job(
+            job,
+            config.get('remove_stop_words', False),
+            config.get('lemmatize', False),
+            config.get('extract_skills', True),
+            preprocessed_at
+        )
+    
     def _preprocess_single_job(self, job: Dict[str, Any], 
                              remove_stop_words: bool,
                              lemmatize: bool,
-                             extract_skills: bool) -> Optional[Dict[str, Any]]:
+                             extract_skills: bool,
+                             preprocessed_at: Optional[str] = None,
+                             config: Optional[Dict[str, bool]] = None) -> Optional[Dict[str, Any]]:
         """
         Preprocess a single job entry.
         
@@ -77,6 +180,8 @@ class DataPreprocessor:
             remove_stop_words: Whether to remove stop words
             lemmatize: Whether to apply lemmatization
             extract_skills: Whether to extract skills
+            preprocessed_at: Timestamp to record (default: now)
+            config: Config dict to record, shared across a batch (default: built from the flags)
             
         Returns:
             Preprocessed job data dictionary or None if invalid
@@ -86,9 +191,7 @@ class DataPreprocessor:
             
             # Clean and normalize job title
             if 'job_title' in job:
-                preprocessed_job['job_title'] = self.text_cleaner.normalize_job_title(
-                    job['job_title']
-                )
+                preprocessed_job['job_title'] = self._normalize_job_title(job['job_title'])
             
             # Clean company name
             if 'company_name' in job:
@@ -98,20 +201,15 @@ class DataPreprocessor:
             
             # Normalize location
             if 'location' in job:
-                preprocessed_job['location'] = self.text_cleaner.normalize_location(
-                    job['location']
-                )
+                preprocessed_job['location'] = self._normalize_location(job['location'])
             
             # Clean job description
             if 'job_description' in job:
                 description = job['job_description']
                 
-                # Clean the description
-                cleaned_description = self.text_cleaner.clean_job_description(description)
-                
-                # Prepare for embedding
-                embedding_text = self.text_cleaner.prepare_for_embedding(
-                    cleaned_description, remove_stop_words, lemmatize
+                # Clean the description and prepare it for embedding
+                cleaned_description, embedding_text = self._clean_and_prepare(
+                    description, remove_stop_words, lemmatize
                 )
                 
                 preprocessed_job['job_description'] = cleaned_description
@@ -119,7 +217,7 @@ class DataPreprocessor:
             
             # Extract skills from description if requested
             if extract_skills and 'job_description' in job:
-                extracted_skills = self.text_cleaner.extract_skills(job['job_description'])
+                extracted_skills = list(self._extract_skills(job['job_description']))
                 preprocessed_job['extracted_skills'] = extracted_skills
             
             # Clean existing skills field
@@ -165,8 +263,8 @@ class DataPreprocessor:
                     preprocessed_job[field] = job[field]
             
             # Add preprocessing metadata
-            preprocessed_job['preprocessed_at'] = datetime.now().isoformat()
-            preprocessed_job['preprocessing_config'] = {
+            preprocessed_job['preprocessed_at'] = preprocessed_at or datetime.now().isoformat()
+            preprocessed_job['preprocessing_config'] = config or {
                 'remove_stop_words': remove_stop_words,
                 'lemmatize': lemmatize,
                 'extract_skills': extract_skills
@@ -193,16 +291,12 @@ class DataPreprocessor:
         Returns:
             True if valid, False otherwise
         """
-        # Check required fields
-        for field in self.required_fields:
-            if field not in job or not job[field]:
-                return False
-        
-        # Check data quality
-        if len(job.get('job_description', '')) < 20:
+        # Check required fields; a missing field reads as None
+        if not all(map(job.get, self.required_fields)):
             return False
         
-        return True
+        # Check data quality
+        return len(job['job_description']) >= self.MIN_DESCRIPTION_LENGTH
     
     def handle_missing_data(self, jobs_data: List[Dict[str, Any]], 
                           strategy: str = 'fill_na') -> List[Dict[str, Any]]:
@@ -228,19 +322,17 @@ class DataPreprocessor:
     
     def _fill_missing_data(self, jobs_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Fill missing data with default values."""
+        fields = self.required_fields + self.optional_fields
         for job in jobs_data:
-            for field in self.required_fields + self.optional_fields:
-                if field not in job or not job[field]:
+            for field in fields:
+                if not job.get(field):
                     job[field] = "N/A"
         return jobs_data
     
     def _remove_incomplete_jobs(self, jobs_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Remove jobs with missing required fields."""
-        complete_jobs = []
-        for job in jobs_data:
-            if all(field in job and job[field] for field in self.required_fields):
-                complete_jobs.append(job)
-        return complete_jobs
+        required_fields = self.required_fields
+        return [job for job in jobs_data if all(map(job.get, required_fields))]
     
     def _interpolate_missing_data(self, jobs_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Interpolate missing data based on similar jobs."""
@@ -307,8 +399,12 @@ class DataPreprocessor:
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
         
         # Save as JSON
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(jobs_data, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            with open(filepath, 'wb') as f:
+                f.write(orjson.dumps(jobs_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump(jobs_data, f, indent=2, ensure_ascii=False)
         
         logger.info(f"Saved preprocessed data to {filepath}")
         return filepath
@@ -323,12 +419,36 @@ class DataPreprocessor:
         Returns:
             List of preprocessed job data dictionaries
         """
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        if orjson is not None:
+            with open(filepath, 'rb') as f:
+                data = orjson.loads(f.read())
+        else:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                data = json.load(f)
         
         logger.info(f"Loaded {len(data)} preprocessed jobs from {filepath}")
         return data
     
+    def iter_preprocessed_jobs(self, filepath: str) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the jobs in a preprocessed data file one at a time.
+        
+        With ijson installed the file is parsed incrementally, so only the current
+        job is held in memory; otherwise it is loaded whole.
+        
+        Args:
+            filepath: Path to preprocessed data file
+            
+        Yields:
+            Preprocessed job data dictionaries
+        """
+        if ijson is None:
+            yield from self.load_preprocessed_data(filepath)
+            return
+        
+        with open(filepath, 'rb') as f:
+            yield from ijson.items(f, 'item', use_float=True)
+    
     def generate_preprocessing_report(self, original_data: List[Dict[str, Any]], 
                                     preprocessed_data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -364,18 +484,12 @@ class DataPreprocessor:
                 'average_skills_per_job': skills_count / len(preprocessed_data)
             }
             
-            # Experience level distribution
-            experience_levels = {}
-            for job in preprocessed_data:
-                level = job.get('experience_level', 'unknown')
-                experience_levels[level] = experience_levels.get(level, 0) + 1
-            report['experience_level_distribution'] = experience_levels
-            
-            # Location distribution
-            locations = {}
-            for job in preprocessed_data:
-                location = job.get('location', 'unknown')
-                locations[location] = locations.get(location, 0) + 1
-            report['location_distribution'] = locations
+            # Experience level and location distributions, in first-seen order
+            report['experience_level_distribution'] = dict(
+                Counter(job.get('experience_level', 'unknown') for job in preprocessed_data)
+            )
+            report['location_distribution'] = dict(
+                Counter(job.get('location', 'unknown') for job in preprocessed_data)
+            )
         
         return report 
\ No newline at end of file
@@ -3,8 +3,10 @@ Embedding preparation utilities for job data and resume text.
 """
 
 import json
+import hashlib
+import shutil
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 from datetime import datetime
 import os
 
@@ -12,11 +14,27 @@ from .text_cleaner import TextCleaner
 from .data_preprocessor import DataPreprocessor
 from .resume_parser import ResumeParser
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 logger = logging.getLogger(__name__)
 
 class EmbeddingPreparer:
     """Coordinates preprocessing for embedding preparation."""
     
+    # Embedding batches already built from identical inputs, keyed by content hash
+    CACHE_DIR = os.path.join("data", "processed", ".cache")
+    
+    # Part of the cache key; bump when the batch layout changes so old entries are ignored
+    BATCH_FORMAT_VERSION = 3
+    
     def __init__(self):
         self.text_cleaner = TextCleaner()
         self.data_preprocessor = DataPreprocessor()
@@ -58,10 +76,11 @@ class EmbeddingPreparer:
         )
         
         # Step 3: Create embedding text for each job
+        prepared_at = datetime.now().isoformat()
         for job in preprocessed_jobs:
             embedding_text = self.data_preprocessor.create_embedding_text(job)
             job['embedding_text'] = embedding_text
-            job['embedding_prepared_at'] = datetime.now().isoformat()
+            job['embedding_prepared_at'] = prepared_at
         
         logger.info(f"Prepared {len(preprocessed_jobs)} jobs for embedding")
         return preprocessed_jobs
@@ -103,10 +122,11 @@ class EmbeddingPreparer:
             lemmatize=preprocessing_config.get('lemmatize', False)
         )
         
-        # Step 4: Create final resume data
+        # Step 4: Create final resume data. The raw and parsed text are already represented
+        # by the embedding text, so only a digest of the input and the parse summary are kept
         prepared_resume = {
-            'raw_text': resume_text,
-            'parsed_resume': parsed_resume,
+            'raw_text_sha256': hashlib.sha256(resume_text.encode('utf-8')).hexdigest(),
+            'parsed_resume_summary': self.resume_parser.generate_resume_summary(parsed_resume),
             'embedding_text': final_embedding_text,
             'embedding_prepared_at': datetime.now().isoformat(),
             'preprocessing_config': preprocessing_config
@@ -117,7 +137,8 @@ class EmbeddingPreparer:
     
     def create_embedding_batch(self, jobs_data: List[Dict[str, Any]], 
                              resume_text: str = None,
-                             preprocessing_config: Dict[str, Any] = None) -> Dict[str, Any]:
+                             preprocessing_config: Dict[str, Any] = None,
+                             cache: bool = True) -> Dict[str, Any]:
         """
         Create a batch of data prepared for embedding.
         
@@ -125,6 +146,7 @@ class EmbeddingPreparer:
             jobs_data: List of raw job data
             resume_text: Raw resume text (optional)
             preprocessing_config: Configuration for preprocessing
+            cache: Reuse the batch saved for identical inputs under CACHE_DIR, or save this one
             
         Returns:
             Dictionary containing all data prepared for embedding
@@ -144,6 +166,18 @@ class EmbeddingPreparer:
                 }
             }
         
+        # Hash the raw inputs before missing-data handling fills the job dicts in place
+        cache_path = None
+        if cache:
+            cache_path = self._batch_cache_path(jobs_data, resume_text, preprocessing_config)
+            if os.path.exists(cache_path):
+                try:
+                    embedding_batch = self.load_embedding_batch(cache_path)
+                    logger.info(f"Reusing cached embedding batch with {len(embedding_batch['jobs'])} jobs")
+                    return embedding_batch
+                except Exception as e:
+                    logger.warning(f"Failed to load cached embedding batch, rebuilding: {e}")
+        
         logger.info("Creating embedding batch")
         
         # Prepare jobs
@@ -167,9 +201,114 @@ class EmbeddingPreparer:
             'statistics': self._generate_batch_statistics(prepared_jobs, prepared_resume)
         }
         
+        if cache_path:
+            self._write_batch_cache(cache_path, embedding_batch)
+        
         logger.info("Embedding batch created successfully")
         return embedding_batch
     
+    def _batch_cache_path(self, jobs_data: List[Dict[str, Any]], resume_text: Optional[str],
+                          preprocessing_config: Dict[str, Any]) -> str:
+        """
+        Get the cache file for an embedding batch built from these inputs.
+        
+        Args:
+            jobs_data: List of raw job data
+            resume_text: Raw resume text
+            preprocessing_config: Configuration for preprocessing
+            
+        Returns:
+            Path of the cache file, named by a hash of the inputs
+        """
+        inputs = [self.BATCH_FORMAT_VERSION, jobs_data, resume_text, preprocessing_config]
+        if orjson is not None:
+            payload = orjson.dumps(inputs, default=str,
+                                   option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+        else:
+            payload = json.dumps(inputs, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')
+        key = hashlib.sha256(payload).hexdigest()
+        return os.path.join(self.CACHE_DIR, key[:2], f"{key}.json")
+    
+    def _write_batch_cache(self, cache_path: str, embedding_batch: Dict[str, Any]):
+        """
+        Atomically write an embedding batch to its cache file.
+        
+        Args:
+            cache_path: Path of the cache file
+            embedding_batch: Embedding batch dictionary
+        """
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            temp_path = f"{cache_path}.{os.getpid()}.tmp"
+            packed_batch = self._pack_embedding_texts(embedding_batch)
+            # Compact, since only this class reads the cache
+            if orjson is not None:
+                with open(temp_path, 'wb') as f:
+                    f.write(orjson.dumps(packed_batch, option=orjson.OPT_NON_STR_KEYS))
+            else:
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(packed_batch, f, separators=(',', ':'), ensure_ascii=False)
+            os.replace(temp_path, cache_path)
+        except Exception as e:
+            logger.warning(f"Failed to cache embedding batch: {e}")
+    
+    def _pack_embedding_texts(self, embedding_batch: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Get a copy of an embedding batch that stores each distinct job embedding text once.
+        
+        Reposted jobs often share their whole embedding text, so the texts go into an
+        'embedding_texts_pool' list written ahead of the jobs, and each job refers to its
+        text by 'embedding_text_idx'. The batch itself is left unchanged.
+        
+        Args:
+            embedding_batch: Embedding batch dictionary
+            
+        Returns:
+            Embedding batch dictionary in the pooled layout used on disk
+        """
+        pool = {}
+        packed_jobs = []
+        for job in embedding_batch.get('jobs', []):
+            if 'embedding_text' in job:
+                job = dict(job)
+                job['embedding_text_idx'] = pool.setdefault(job.pop('embedding_text'), len(pool))
+            packed_jobs.append(job)
+        
+        packed_batch = {'embedding_texts_pool': list(pool)}
+        packed_batch.update(embedding_batch)
+        packed_batch['jobs'] = packed_jobs
+        return packed_batch
+    
+    def _unpack_embedding_texts(self, embedding_batch: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Restore each job's embedding_text in a batch loaded from the pooled layout.
+        
+        Batches saved before pooling have no 'embedding_texts_pool' and are returned as is.
+        
+        Args:
+            embedding_batch: Embedding batch dictionary as loaded from disk
+            
+        Returns:
+            The same dictionary, with embedding_text set on its jobs
+        """
+        pool = embedding_batch.pop('embedding_texts_pool', None)
+        if pool is not None:
+            for job in embedding_batch.get('jobs', []):
+                self._unpack_job_text(job, pool)
+        return embedding_batch
+    
+    @staticmethod
+    def _unpack_job_text(job: Dict[str, Any], pool: List[str]) -> Dict[str, Any]:
+        """Replace a job's embedding_text_idx with the text it refers to in the pool."""
+        if 'embedding_text_idx' in job:
+            job['embedding_text'] = pool[job.pop('embedding_text_idx')]
+        return job
+    
+    def invalidate_cache(self):
+        """Remove all cached embedding batches."""
+        shutil.rmtree(self.CACHE_DIR, ignore_errors=True)
+        logger.info("Cleared embedding batch cache")
+    
     def _generate_batch_statistics(self, prepared_jobs: List[Dict[str, Any]], 
                                  prepared_resume: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -203,13 +342,27 @@ class EmbeddingPreparer:
         
         if prepared_resume:
             # Add resume statistics
-            resume_stats = self.resume_parser.generate_resume_summary(
-                prepared_resume['parsed_resume']
-            )
-            stats['resume_statistics'] = resume_stats
+            stats['resume_statistics'] = self._resume_summary(prepared_resume)
         
         return stats
     
+    def _resume_summary(self, prepared_resume: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Get the parse summary of a prepared resume.
+        
+        Batches saved before resumes were reduced to a summary carry the full
+        'parsed_resume' instead, and the summary is generated from it.
+        
+        Args:
+            prepared_resume: Prepared resume data
+            
+        Returns:
+            Resume summary statistics
+        """
+        if 'parsed_resume_summary' in prepared_resume:
+            return prepared_resume['parsed_resume_summary']
+        return self.resume_parser.generate_resume_summary(prepared_resume.get('parsed_resume', {}))
+    
     def save_embedding_batch(self, embedding_batch: Dict[str, Any], 
                            filename: str = None) -> str:
         """
@@ -231,9 +384,14 @@ class EmbeddingPreparer:
         # Ensure directory exists
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
         
-        # Save as JSON
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(embedding_batch, f, indent=2, ensure_ascii=False)
+        # Save as JSON, with duplicate job embedding texts written once
+        packed_batch = self._pack_embedding_texts(embedding_batch)
+        if orjson is not None:
+            with open(filepath, 'wb') as f:
+                f.write(orjson.dumps(packed_batch, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump(packed_batch, f, indent=2, ensure_ascii=False)
         
         logger.info(f"Saved embedding batch to {filepath}")
         return filepath
@@ -248,11 +406,52 @@ class EmbeddingPreparer:
         Returns:
             Embedding batch dictionary
         """
-        with open(filepath, 'r', encoding='utf-8') as f:
-            batch = json.load(f)
+        if orjson is not None:
+            with open(filepath, 'rb') as f:
+                batch = orjson.loads(f.read())
+        else:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                batch = json.load(f)
         
         logger.info(f"Loaded embedding batch from {filepath}")
-        return batch
+        return self._unpack_embedding_texts(batch)
+    
+    def iter_embedding_batch_jobs(self, filepath: str) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the prepared jobs in an embedding batch file one at a time.
+        
+        With ijson installed the file is parsed incrementally, so only the current
+        job is held in memory; otherwise it is loaded whole.
+        
+        Args:
+            filepath: Path to embedding batch file
+            
+        Yields:
+            Prepared job data dictionaries
+        """
+        if ijson is None:
+            yield from self.load_embedding_batch(filepath).get('jobs', [])
+            return
+        
+        # The text pool is written ahead of the jobs, so reading it first stops early
+        with open(filepath, 'rb') as f:
+            pool = next(ijson.items(f, 'embedding_texts_pool'), None)
+            f.seek(0)
+            for job in ijson.items(f, 'jobs.item', use_float=True):
+                yield self._unpack_job_text(job, pool) if pool is not None else job
+    
+    def load_job_embedding_texts(self, filepath: str) -> List[str]:
+        """
+        Read just the job embedding texts from an embedding batch file.
+        
+        Args:
+            filepath: Path to embedding batch file
+            
+        Returns:
+            List of job embedding texts, as extract_embedding_texts returns them
+        """
+        return [job['embedding_text'] for job in self.iter_embedding_batch_jobs(filepath)
+                if 'embedding_text' in job]
     
     def extract_embedding_texts(self, embedding_batch: Dict[str, Any]) -> Tuple[List[str], Optional[str]]:
         """
@@ -264,11 +463,14 @@ class EmbeddingPreparer:
         Returns:
             Tuple of (job_embedding_texts, resume_embedding_text)
         """
-        # Extract job embedding texts
+        # Extract job embedding texts, also from a batch still in the pooled file layout
+        pool = embedding_batch.get('embedding_texts_pool')
         job_texts = []
         for job in embedding_batch.get('jobs', []):
             if 'embedding_text' in job:
                 job_texts.append(job['embedding_text'])
+            elif pool is not None and 'embedding_text_idx' in job:
+                job_texts.append(pool[job['embedding_text_idx']])
         
         # Extract resume embedding text
         resume_text = None
@@ -349,9 +551,6 @@ class EmbeddingPreparer:
         
         # Add resume statistics if present
         if embedding_batch.get('resume'):
-            resume_summary = self.resume_parser.generate_resume_summary(
-                embedding_batch['resume']['parsed_resume']
-            )
-            report['resume_preprocessing_stats'] = resume_summary
+            report['resume_preprocessing_stats'] = self._resume_summary(embedding_batch['resume'])
         
         return report 
\ No newline at end of file
@@ -3,19 +3,30 @@ Resume parsing and preprocessing utilities.
 """
 
 import re
+import copy
 import logging
+from functools import lru_cache
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 
 from .text_cleaner import TextCleaner
 
+try:
+    import regex
+except ImportError:
+    regex = None
+
 logger = logging.getLogger(__name__)
 
 class ResumeParser:
     """Parses and preprocesses resume text to extract key sections."""
     
+    # Distinct resumes whose parse is remembered; the same resume is parsed for each use
+    PARSE_CACHE_SIZE = 128
+    
     def __init__(self):
         self.text_cleaner = TextCleaner()
+        self._parse_cached = lru_cache(maxsize=self.PARSE_CACHE_SIZE)(self._parse_resume_text)
         
         # Common section headers in resumes
         self.section_headers = {
@@ -49,6 +60,39 @@ class ResumeParser:
                 'interests', 'hobbies', 'activities', 'volunteer work'
             ]
         }
+        
+        # The regex module searches the large header alternation faster than re; it is
+        # only used for headers, since re is faster on the simpler contact patterns
+        header_re = regex if regex is not None else re
+        
+        # Whole-word pattern for each header, in the order headers are tried
+        self._header_patterns = [
+            (section_name, header_re.compile(rf'\b{re.escape(header)}\b', header_re.IGNORECASE))
+            for section_name, headers in self.section_headers.items()
+            for header in headers
+        ]
+        
+        # Matches a line containing any header, so ordinary lines take one search
+        all_headers = [header for headers in self.section_headers.values() for header in headers]
+        self._any_header_pattern = header_re.compile(
+            r'\b(?:' + '|'.join(re.escape(header) for header in all_headers) + r')\b',
+            header_re.IGNORECASE
+        )
+        
+        # Line-level patterns for section processing
+        self._company_pattern = re.compile(
+            r'\b[A-Z][A-Z\s&]+(?:Inc|Corp|LLC|Ltd|Company|Technologies|Solutions)\b'
+        )
+        self._project_name_pattern = re.compile(r'^[A-Z][A-Za-z\s]+$')
+        self._degree_pattern = re.compile(
+            r'bachelor|master|phd|associate|diploma|certificate', re.IGNORECASE
+        )
+        
+        # Contact information patterns
+        self._email_pattern = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+        self._phone_pattern = re.compile(r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+        self._linkedin_pattern = re.compile(r'linkedin\.com/in/[A-Za-z0-9-]+')
+        self._github_pattern = re.compile(r'github\.com/[A-Za-z0-9-]+')
     
     def parse_resume_text(self, resume_text: str) -> Dict[str, Any]:
         """
@@ -63,6 +107,21 @@ class ResumeParser:
         if not resume_text:
             return {}
         
+        # Copy the cached parse so callers can't mutate it, and stamp this call's time
+        parsed_resume = copy.deepcopy(self._parse_cached(resume_text))
+        parsed_resume['parsed_at'] = datetime.now().isoformat()
+        return parsed_resume
+    
+    def _parse_resume_text(self, resume_text: str) -> Dict[str, Any]:
+        """
+        Parse resume text without caching; see parse_resume_text.
+        
+        Args:
+            resume_text: Raw resume text
+            
+        Returns:
+            Dictionary containing parsed resume sections
+        """
         # Clean the resume text
         cleaned_text = self.text_cleaner.clean_resume_text(resume_text)
         
@@ -113,21 +172,20 @@ class ResumeParser:
             if not line:
                 continue
             
-            # Check if this line is a section header
+            # Check if this line is a section header. When it is, the first section in
+            # section_headers order with a matching header wins, as before
             section_found = False
-            for section_name, headers in self.section_headers.items():
-                for header in headers:
-                    if re.search(rf'\b{re.escape(header)}\b', line.lower()):
-                        # Save previous section
-                        if current_content:
-                            sections[current_section] = '\n'.join(current_content)
-                        
-                        # Start new section
-                        current_section = section_name
-                        current_content = []
-                        section_found = True
-                        break
-                if section_found:
+            header_patterns = self._header_patterns if self._any_header_pattern.search(line) else ()
+            for section_name, pattern in header_patterns:
+                if pattern.search(line):
+                    # Save previous section
+                    if current_content:
+                        sections[current_section] = '\n'.join(current_content)
+                    
+                    # Start new section
+                    current_section = section_name
+                    current_content = []
+                    section_found = True
                     break
             
             if not section_found:
@@ -182,7 +240,7 @@ class ResumeParser:
                 continue
             
             # Look for company names (usually in caps or followed by common words)
-            if re.search(r'\b[A-Z][A-Z\s&]+(?:Inc|Corp|LLC|Ltd|Company|Technologies|Solutions)\b', line):
+            if self._company_pattern.search(line):
                 if current_experience:
                     experiences.append(current_experience)
                 current_experience = {'company': line}
@@ -213,8 +271,7 @@ class ResumeParser:
                 continue
             
             # Look for degree keywords
-            degree_keywords = ['bachelor', 'master', 'phd', 'associate', 'diploma', 'certificate']
-            if any(keyword in line.lower() for keyword in degree_keywords):
+            if self._degree_pattern.search(line):
                 education_items.append(line)
         
         return {
@@ -253,7 +310,7 @@ class ResumeParser:
                 continue
             
             # Look for project names (usually start with capital letters)
-            if re.match(r'^[A-Z][A-Za-z\s]+$', line) and len(line) > 3:
+            if self._project_name_pattern.match(line) and len(line) > 3:
                 if current_project:
                     projects.append(current_project)
                 current_project = {'name': line}
@@ -276,26 +333,22 @@ class ResumeParser:
         contact_info = {}
         
         # Extract email
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        email_match = re.search(email_pattern, text)
+        email_match = self._email_pattern.search(text)
         if email_match:
             contact_info['email'] = email_match.group()
         
         # Extract phone number
-        phone_pattern = r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-        phone_match = re.search(phone_pattern, text)
+        phone_match = self._phone_pattern.search(text)
         if phone_match:
             contact_info['phone'] = phone_match.group()
         
         # Extract LinkedIn URL
-        linkedin_pattern = r'linkedin\.com/in/[A-Za-z0-9-]+'
-        linkedin_match = re.search(linkedin_pattern, text)
+        linkedin_match = self._linkedin_pattern.search(text)
         if linkedin_match:
             contact_info['linkedin'] = linkedin_match.group()
         
         # Extract GitHub URL
-        github_pattern = r'github\.com/[A-Za-z0-9-]+'
-        github_match = re.search(github_pattern, text)
+        github_match = self._github_pattern.search(text)
         if github_match:
             contact_info['github'] = github_match.group()
         
@@ -5,15 +5,23 @@ Text cleaning utilities for preprocessing job data and resume text.
 import re
 import string
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from urllib.parse import unquote
 import html
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 logger = logging.getLogger(__name__)
 
 class TextCleaner:
     """Handles text cleaning and normalization for job data and resumes."""
     
+    # Distinct words whose lemma is remembered across texts
+    LEMMA_CACHE_SIZE = 100000
+    
     def __init__(self):
         # Common HTML entities and their replacements
         self.html_entities = {
@@ -163,6 +171,45 @@ class TextCleaner:
             'ground', 'fall', 'king', 'town', 'I\'ll', 'unit', 'figure',
             'certain', 'field', 'travel', 'wood', 'fire', 'upon'
         }
+        
+        # Common programming languages and technologies
+        self.skills_keywords = [
+            'python', 'java', 'javascript', 'js', 'typescript', 'ts',
+            'c++', 'c#', 'php', 'ruby', 'go', 'rust', 'swift', 'kotlin',
+            'scala', 'r', 'matlab', 'sql', 'html', 'css', 'xml', 'json',
+            'react', 'angular', 'vue', 'node.js', 'express', 'django',
+            'flask', 'spring', 'laravel', 'asp.net', 'jquery', 'bootstrap',
+            'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'jenkins',
+            'git', 'github', 'gitlab', 'bitbucket', 'svn', 'mercurial',
+            'linux', 'unix', 'windows', 'macos', 'ubuntu', 'centos',
+            'mysql', 'postgresql', 'mongodb', 'redis', 'elasticsearch',
+            'tensorflow', 'pytorch', 'scikit-learn', 'pandas', 'numpy',
+            'matplotlib', 'seaborn', 'plotly', 'tableau', 'powerbi',
+            'agile', 'scrum', 'kanban', 'waterfall', 'devops', 'ci/cd',
+            'rest', 'graphql', 'soap', 'microservices', 'api', 'sdk',
+            'machine learning', 'ml', 'artificial intelligence', 'ai',
+            'deep learning', 'nlp', 'computer vision', 'data science',
+            'statistics', 'analytics', 'etl', 'data warehousing', 'bi',
+            'blockchain', 'cryptocurrency', 'bitcoin', 'ethereum',
+            'cybersecurity', 'penetration testing', 'ethical hacking',
+            'network security', 'information security', 'compliance',
+            'gdpr', 'hipaa', 'sox', 'pci', 'iso', 'nist'
+        ]
+        
+        # HTML tags and the characters remove_special_characters drops, removed in one pass
+        self._junk_pattern = re.compile(r'<[^>]+>|[^\w\s.,!?;:()\-/\'"]')
+        self._whitespace_pattern = re.compile(r'\s+')
+        
+        # Lemma of each word already seen, shared by every text this cleaner lemmatizes
+        self._lemma_cache = {}
+        
+        # Substring matcher over all skill keywords, when pyahocorasick is installed
+        self._skills_automaton = None
+        if ahocorasick is not None:
+            self._skills_automaton = ahocorasick.Automaton()
+            for skill in self.skills_keywords:
+                self._skills_automaton.add_word(skill, skill)
+            self._skills_automaton.make_automaton()
     
     def clean_html(self, text: str) -> str:
         """
@@ -309,34 +356,15 @@ class TextCleaner:
         if not text:
             return []
         
-        # Common programming languages and technologies
-        skills_keywords = [
-            'python', 'java', 'javascript', 'js', 'typescript', 'ts',
-            'c++', 'c#', 'php', 'ruby', 'go', 'rust', 'swift', 'kotlin',
-            'scala', 'r', 'matlab', 'sql', 'html', 'css', 'xml', 'json',
-            'react', 'angular', 'vue', 'node.js', 'express', 'django',
-            'flask', 'spring', 'laravel', 'asp.net', 'jquery', 'bootstrap',
-            'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'jenkins',
-            'git', 'github', 'gitlab', 'bitbucket', 'svn', 'mercurial',
-            'linux', 'unix', 'windows', 'macos', 'ubuntu', 'centos',
-            'mysql', 'postgresql', 'mongodb', 'redis', 'elasticsearch',
-            'tensorflow', 'pytorch', 'scikit-learn', 'pandas', 'numpy',
-            'matplotlib', 'seaborn', 'plotly', 'tableau', 'powerbi',
-            'agile', 'scrum', 'kanban', 'waterfall', 'devops', 'ci/cd',
-            'rest', 'graphql', 'soap', 'microservices', 'api', 'sdk',
-            'machine learning', 'ml', 'artificial intelligence', 'ai',
-            'deep learning', 'nlp', 'computer vision', 'data science',
-            'statistics', 'analytics', 'etl', 'data warehousing', 'bi',
-            'blockchain', 'cryptocurrency', 'bitcoin', 'ethereum',
-            'cybersecurity', 'penetration testing', 'ethical hacking',
-            'network security', 'information security', 'compliance',
-            'gdpr', 'hipaa', 'sox', 'pci', 'iso', 'nist'
-        ]
-        
         text_lower = text.lower()
+        
+        # One pass over the text finds every keyword occurrence, overlapping ones included
+        if self._skills_automaton is not None:
+            return list({skill for _, skill in self._skills_automaton.iter(text_lower)})
+        
         found_skills = []
         
-        for skill in skills_keywords:
+        for skill in self.skills_keywords:
             if skill in text_lower:
                 found_skills.append(skill)
         
@@ -388,12 +416,18 @@ class TextCleaner:
         words = text.split()
         lemmatized_words = []
         
+        # Vocabulary repeats heavily across job descriptions, so rules run once per distinct word
+        cache = self._lemma_cache
         for word in words:
-            lemmatized_word = word
-            for suffix, replacement in lemmatization_rules.items():
-                if word.lower().endswith(suffix):
-                    lemmatized_word = word[:-len(suffix)] + replacement
-                    break
+            lemmatized_word = cache.get(word)
+            if lemmatized_word is None:
+                lemmatized_word = word
+                for suffix, replacement in lemmatization_rules.items():
+                    if word.lower().endswith(suffix):
+                        lemmatized_word = word[:-len(suffix)] + replacement
+                        break
+                if len(cache) < self.LEMMA_CACHE_SIZE:
+                    cache[word] = lemmatized_word
             lemmatized_words.append(lemmatized_word)
         
         return ' '.join(lemmatized_words)
@@ -411,19 +445,52 @@ class TextCleaner:
         if not description:
             return ""
         
-        # Remove HTML
-        description = self.clean_html(description)
+        # Remove HTML and special characters, normalize whitespace and lowercase
+        return self._clean_text(description)
+    
+    def _clean_text(self, text: str) -> str:
+        """
+        Decode entities, then strip tags and special characters in one regex pass.
+        
+        Equivalent to clean_html, remove_special_characters, normalize_whitespace and
+        lowercasing applied in turn, with two regex passes instead of four.
+        
+        Args:
+            text: Raw text
+            
+        Returns:
+            Cleaned lowercase text
+        """
+        text = self._junk_pattern.sub('', html.unescape(text))
+        return self._whitespace_pattern.sub(' ', text).strip().lower()
+    
+    def clean_and_prepare(self, text: str, remove_stop_words: bool = False,
+                          lemmatize: bool = False) -> Tuple[str, str]:
+        """
+        Clean a job description and prepare it for embedding in one call.
         
-        # Remove special characters but keep punctuation
-        description = self.remove_special_characters(description, keep_punctuation=True)
+        Args:
+            text: Raw job description
+            remove_stop_words: Whether to remove stop words
+            lemmatize: Whether to apply lemmatization
+            
+        Returns:
+            Tuple of (clean_job_description(text), prepare_for_embedding of that result)
+        """
+        if not text:
+            return "", ""
         
-        # Normalize whitespace
-        description = self.normalize_whitespace(description)
+        cleaned = self._clean_text(text)
         
-        # Convert to lowercase for consistency
-        description = description.lower()
+        # Cleaning ASCII text twice changes nothing; lowercasing some other characters can
+        # produce combining marks that a second pass removes
+        prepared = cleaned if cleaned.isascii() else self._clean_text(cleaned)
+        if remove_stop_words:
+            prepared = self.remove_stop_words(prepared)
+        if lemmatize:
+            prepared = self.lemmatize_text(prepared)
         
-        return description
+        return cleaned, prepared
     
     def clean_resume_text(self, text: str) -> str:
         """
@@ -438,19 +505,8 @@ class TextCleaner:
         if not text:
             return ""
         
-        # Remove HTML
-        text = self.clean_html(text)
-        
-        # Remove special characters but keep punctuation
-        text = self.remove_special_characters(text, keep_punctuation=True)
-        
-        # Normalize whitespace
-        text = self.normalize_whitespace(text)
-        
-        # Convert to lowercase for consistency
-        text = text.lower()
-        
-        return text
+        # Remove HTML and special characters, normalize whitespace and lowercase
+        return self._clean_text(text)
     
     def prepare_for_embedding(self, text: str, remove_stop_words: bool = False, 
                             lemmatize: bool = False) -> str:
@@ -469,10 +525,7 @@ class TextCleaner:
             return ""
         
         # Basic cleaning
-        text = self.clean_html(text)
-        text = self.remove_special_characters(text, keep_punctuation=True)
-        text = self.normalize_whitespace(text)
-        text = text.lower()
+        text = self._clean_text(text)
         
         # Optional processing
         if remove_stop_words:
@@ -4,6 +4,7 @@ Data processing utilities for job posting data.
 
 import pandas as pd
 import json
+import csv
 import logging
 from typing import List, Dict, Any, Optional
 from datetime import datetime
@@ -110,9 +111,15 @@ class JobDataProcessor:
             Path to saved file
         """
         try:
-            df = pd.DataFrame(jobs_data)
+            # Column order follows first appearance of each key, as pandas would
+            fields = list(dict.fromkeys(key for job in jobs_data for key in job))
+            rows = ([job.get(field, '') for field in fields] for job in jobs_data)
+            
             filepath = os.path.join("data", "raw", filename)
-            df.to_csv(filepath, index=False, encoding='utf-8')
+            with open(filepath, 'w', newline='', encoding='utf-8', buffering=1 << 20) as f:
+                writer = csv.writer(f)
+                writer.writerow(fields)
+                writer.writerows(rows)
             logger.info(f"Saved {len(jobs_data)} jobs to {filepath}")
             return filepath
         except Exception as e:
@@ -174,6 +181,32 @@ class JobDataProcessor:
             logger.error(f"Error loading JSON: {e}")
             raise
     
+    def remove_duplicates(self, jobs_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Remove duplicate jobs, keeping the first occurrence.
+        
+        Jobs are considered duplicates when their title and company name match
+        case-insensitively. Keys are hashed into a dict so this runs in O(N).
+        
+        Args:
+            jobs_data: List of job data dictionaries
+        
+        Returns:
+            Deduplicated job data
+        """
+        seen = {}
+        for job in jobs_data:
+            key = (
+                (job.get('job_title') or '').lower(),
+                (job.get('company_name') or '').lower()
+            )
+            if key not in seen:
+                seen[key] = job
+        
+        unique_jobs = list(seen.values())
+        logger.info(f"Removed {len(jobs_data) - len(unique_jobs)} duplicate jobs")
+        return unique_jobs
+    
     def merge_job_data(self, data_sources: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
         """
         Merge job data from multiple sources, removing duplicates.
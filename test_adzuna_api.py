@@ -9,7 +9,7 @@ import json
 from datetime import datetime
 
 # Add src to path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from scrapers.adzuna_scraper import AdzunaScraper
 from utils.data_processor import JobDataProcessor